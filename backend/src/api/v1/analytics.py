@@ -0,0 +1,111 @@
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+import httpx
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.database import get_db
+from src.core.dependencies import get_current_user, get_rates_fetcher
+from src.core.forecast import fit_expense_model, forecast_cache
+from src.core.rates import RatesFetcher, convert_amounts, load_rate_table, rate_key
+from src.models.transaction_rollup import TransactionDailyRollup
+from src.models.user import User
+from src.schemas.analytics import ExpenseForecastPoint
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+
+async def _daily_expenses(
+    db: AsyncSession,
+    fetcher: RatesFetcher,
+    *,
+    user_id: int,
+    currency: str,
+    start_date: date | None,
+    end_date: date | None,
+) -> tuple[list[date], list[float], bool]:
+    """Expense per rollup day in ``currency``; the flag is False when some rates were missing."""
+    query = (
+        select(
+            TransactionDailyRollup.day,
+            TransactionDailyRollup.currency,
+            func.sum(TransactionDailyRollup.total).label("total"),
+        )
+        .filter(
+            TransactionDailyRollup.user_id == user_id,
+            TransactionDailyRollup.transaction_type == "expense",
+        )
+        .group_by(TransactionDailyRollup.day, TransactionDailyRollup.currency)
+        .order_by(TransactionDailyRollup.day)
+    )
+    if start_date:
+        query = query.filter(TransactionDailyRollup.day >= start_date)
+    if end_date:
+        query = query.filter(TransactionDailyRollup.day <= end_date)
+    rows = (await db.execute(query)).all()
+    if not rows:
+        return [], [], True
+
+    keys = [rate_key(row.day) for row in rows]
+    rate_table = {}
+    if any(row.currency != currency for row in rows):
+        try:
+            rate_table, _ = await load_rate_table(
+                fetcher, {date.fromisoformat(key) if key else None for key in keys}
+            )
+        except (HTTPException, httpx.HTTPError):
+            rate_table = {}
+
+    converted = convert_amounts(
+        [row.total for row in rows],
+        [row.currency for row in rows],
+        currency,
+        keys,
+        rate_table,
+    )
+    complete = not np.isnan(converted).any()
+
+    days = np.array([row.day for row in rows], dtype="datetime64[D]")
+    unique_days, day_index = np.unique(days, return_inverse=True)
+    totals = np.bincount(day_index, weights=np.nan_to_num(converted), minlength=len(unique_days))
+    has_expense = totals > 0
+    return (
+        unique_days[has_expense].astype(date).tolist(),
+        totals[has_expense].tolist(),
+        complete,
+    )
+
+
+@router.get("/forecast", response_model=list[ExpenseForecastPoint])
+async def get_expense_forecast(
+    *,
+    horizon: int = Query(7, ge=1, le=90),
+    currency: str = Query("RUB", pattern="^(RUB|USD|EUR|AED)$"),
+    start_date: date | None = None,
+    end_date: date | None = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    fetcher: RatesFetcher = Depends(get_rates_fetcher),
+):
+    # data_version changes with every write that touches the user's rollups
+    cache_key = (current_user.data_version, horizon, currency, start_date, end_date)
+    model = forecast_cache.get(current_user.id, cache_key)
+
+    if model is None:
+        days, expenses, complete = await _daily_expenses(
+            db,
+            fetcher,
+            user_id=current_user.id,
+            currency=currency,
+            start_date=start_date,
+            end_date=end_date,
+        )
+        model = fit_expense_model(days, expenses, horizon)
+        if complete:
+            forecast_cache.set(current_user.id, cache_key, model)
+
+    return [
+        ExpenseForecastPoint(date=day, predicted_expense=value) for day, value in model.forecast()
+    ]
@@ -1,10 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from datetime import UTC, datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.changes import next_change_seq
+from src.core.conditional import check_not_modified, user_etag
 from src.core.database import get_db
 from src.core.dependencies import get_current_user
+from src.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, page_limit
+from src.core.rollups import RollupDeltas, apply_rollup_deltas
+from src.core.writes import update_owned
 from src.models.category import Category
+from src.models.transaction import Transaction
 from src.models.user import User
 from src.schemas.category import CategoryCreate, CategoryResponse, CategoryUpdate
 
@@ -20,6 +28,7 @@ async def create_category(
     new_category = Category(
         **category_data.model_dump(),
         user_id=current_user.id,
+        change_seq=await next_change_seq(db, current_user),
     )
 
     db.add(new_category)
@@ -31,15 +40,43 @@ async def create_category(
 
 @router.get("", response_model=list[CategoryResponse])
 async def get_categories(
+    request: Request,
+    response: Response,
+    *,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Depends(page_limit),
+    cursor: str | None = None,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    result = await db.execute(
-        select(Category).filter(Category.user_id == current_user.id).offset(skip).limit(limit)
+    not_modified = check_not_modified(request, response, user_etag(request, current_user))
+    if not_modified:
+        return not_modified
+
+    query = (
+        select(Category)
+        .filter(Category.user_id == current_user.id, Category.deleted_at.is_(None))
+        .order_by(Category.id)
     )
+
+    if cursor:
+        (cursor_id,) = decode_cursor(cursor, 1)
+        if not isinstance(cursor_id, int):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
+        query = query.filter(Category.id > cursor_id)
+    elif skip:
+        query = query.offset(skip)
+
+    result = await db.execute(query.limit(limit + 1))
     categories = result.scalars().all()
+
+    if len(categories) > limit:
+        categories = categories[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([categories[-1].id])
+
     return categories
 
 
@@ -50,7 +87,11 @@ async def get_category(
     current_user: User = Depends(get_current_user),
 ):
     result = await db.execute(
-        select(Category).filter(Category.id == category_id, Category.user_id == current_user.id)
+        select(Category).filter(
+            Category.id == category_id,
+            Category.user_id == current_user.id,
+            Category.deleted_at.is_(None),
+        )
     )
     category = result.scalar_one_or_none()
 
@@ -70,10 +111,14 @@ async def update_category(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    result = await db.execute(
-        select(Category).filter(Category.id == category_id, Category.user_id == current_user.id)
+    update_data = category_update.model_dump(exclude_unset=True)
+    category = await update_owned(
+        db,
+        Category,
+        row_id=category_id,
+        user_id=current_user.id,
+        values={**update_data, "change_seq": await next_change_seq(db, current_user)},
     )
-    category = result.scalar_one_or_none()
 
     if not category:
         raise HTTPException(
@@ -81,12 +126,7 @@ async def update_category(
             detail="Category not found",
         )
 
-    update_data = category_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(category, field, value)
-
     await db.commit()
-    await db.refresh(category)
 
     return category
 
@@ -97,10 +137,16 @@ async def delete_category(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    result = await db.execute(
-        select(Category).filter(Category.id == category_id, Category.user_id == current_user.id)
+    change_seq = await next_change_seq(db, current_user)
+    now = datetime.now(UTC)
+
+    category = await update_owned(
+        db,
+        Category,
+        row_id=category_id,
+        user_id=current_user.id,
+        values={"deleted_at": now, "updated_at": now, "change_seq": change_seq},
     )
-    category = result.scalar_one_or_none()
 
     if not category:
         raise HTTPException(
@@ -108,5 +154,24 @@ async def delete_category(
             detail="Category not found",
         )
 
-    await db.delete(category)
+    # Transactions of a deleted category stay, without a category
+    detached = await db.execute(
+        update(Transaction)
+        .where(Transaction.category_id == category_id, Transaction.deleted_at.is_(None))
+        .values(category_id=None, updated_at=now, change_seq=change_seq, fingerprint=None)
+        .returning(
+            Transaction.user_id,
+            Transaction.transaction_date,
+            Transaction.currency,
+            Transaction.transaction_type,
+            Transaction.amount,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    deltas = RollupDeltas()
+    for row in detached:
+        deltas.add_row({**row._mapping, "category_id": category_id}, sign=-1)
+        deltas.add_row({**row._mapping, "category_id": None})
+    await apply_rollup_deltas(db, deltas)
+
     await db.commit()
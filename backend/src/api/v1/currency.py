@@ -1,18 +1,34 @@
 """API для получения курсов валют"""
 
-from datetime import UTC, datetime
+from datetime import UTC, date as date_type, datetime, timedelta
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 import httpx
+import numpy as np
+
+from src.core.config import settings
+from src.core.dependencies import get_rates_fetcher
+from src.core.rates import (
+    BASE_CURRENCY,
+    RatesFetcher,
+    cbr_breaker,
+    convert_amounts,
+    fallback_breaker,
+    hedge_stats,
+    load_rate_table,
+    load_rates,
+    load_rates_for_dates,
+    rate_key,
+    rates_cache,
+)
+from src.schemas.currency import (
+    CurrencyConvertBatchRequest,
+    CurrencyConvertBatchResponse,
+    CurrencyRatesBatchRequest,
+)
 
 router = APIRouter(prefix="/currency", tags=["Currency"])
 
-CBR_API = "https://www.cbr-xml-daily.ru"
-FALLBACK_EXCHANGE_RATE_API = "https://open.er-api.com/v6/latest"
-BASE_CURRENCY = "RUB"
-SUPPORTED_CURRENCIES = ("RUB", "USD", "EUR", "AED")
-HTTP_OK = 200
-
 
 def _normalize_date(date: str | None) -> str | None:
     if not date:
@@ -31,69 +47,73 @@ def _normalize_date(date: str | None) -> str | None:
     return parsed.isoformat()
 
 
-def _build_response(data: dict) -> dict:
-    if "Valute" in data:
-        valute = data.get("Valute", {})
-        rates = {}
-        for code in ("USD", "EUR", "AED"):
-            info = valute.get(code)
-            if not info:
-                rates[code] = 0
-                continue
-            nominal = info.get("Nominal") or 1
-            value = info.get("Value") or 0
-            rates[code] = nominal / value if value else 0
-
-        raw_date = data.get("Date")
-        date = raw_date
-        if raw_date:
-            try:
-                date = datetime.fromisoformat(raw_date).date().isoformat()
-            except ValueError:
-                date = datetime.now(UTC).date().isoformat()
-        else:
-            date = datetime.now(UTC).date().isoformat()
+def _collect_batch_dates(
+    dates: list[date_type],
+    start_date: date_type | None,
+    end_date: date_type | None,
+) -> list[date_type]:
+    today = datetime.now(UTC).date()
+    requested = {day for day in dates if day <= today}
 
-        base = BASE_CURRENCY
-    else:
-        rates = data.get("rates", {})
-        base = data.get("base") or data.get("base_code") or BASE_CURRENCY
-        date = data.get("date") or datetime.now(UTC).date().isoformat()
+    if start_date or end_date:
+        if not (start_date and end_date) or start_date > end_date:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Both start_date and end_date are required and must form a valid range",
+            )
+        span = (min(end_date, today) - start_date).days + 1
+        if span > settings.currency_batch_max_dates:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Too many dates. Maximum: {settings.currency_batch_max_dates}",
+            )
+        requested.update(start_date + timedelta(days=offset) for offset in range(max(span, 0)))
+
+    if len(requested) > settings.currency_batch_max_dates:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many dates. Maximum: {settings.currency_batch_max_dates}",
+        )
+    return sorted(requested)
+
+
+async def _get_rates_batch(
+    fetcher: RatesFetcher,
+    dates: list[date_type],
+    start_date: date_type | None,
+    end_date: date_type | None,
+) -> dict:
+    days = _collect_batch_dates(dates, start_date, end_date)
+    rates_by_date, missing = await load_rates_for_dates(fetcher, days)
+    return {"base": BASE_CURRENCY, "rates_by_date": rates_by_date, "missing": missing}
+
+
+@router.get("/rates/batch")
+async def get_currency_rates_batch(
+    dates: list[date_type] = Query([]),
+    start_date: date_type | None = None,
+    end_date: date_type | None = None,
+    fetcher: RatesFetcher = Depends(get_rates_fetcher),
+):
+    return await _get_rates_batch(fetcher, dates, start_date, end_date)
 
-    return {
-        "base": base,
-        "date": date,
-        "rates": {
-            "RUB": 1.0,
-            "USD": rates.get("USD", 0),
-            "EUR": rates.get("EUR", 0),
-            "AED": rates.get("AED", 0),
-        },
-    }
+
+@router.post("/rates/batch")
+async def post_currency_rates_batch(
+    batch: CurrencyRatesBatchRequest,
+    fetcher: RatesFetcher = Depends(get_rates_fetcher),
+):
+    return await _get_rates_batch(fetcher, batch.dates, batch.start_date, batch.end_date)
 
 
 @router.get("/rates")
-async def get_currency_rates(date: str | None = None):
+async def get_currency_rates(
+    date: str | None = None,
+    fetcher: RatesFetcher = Depends(get_rates_fetcher),
+):
     try:
         endpoint = _normalize_date(date)
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            cbr_url = (
-                f"{CBR_API}/daily_json.js"
-                if not endpoint
-                else f"{CBR_API}/archive/{endpoint.replace('-', '/')}/daily_json.js"
-            )
-            response = await client.get(cbr_url)
-            if response.status_code == HTTP_OK:
-                return _build_response(response.json())
-
-            fallback = await client.get(f"{FALLBACK_EXCHANGE_RATE_API}/{BASE_CURRENCY}")
-            if fallback.status_code == HTTP_OK:
-                return _build_response(fallback.json())
-
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Currency service unavailable",
-            )
+        return await load_rates(fetcher, endpoint)
     except httpx.TimeoutException as err:
         raise HTTPException(
             status_code=status.HTTP_504_GATEWAY_TIMEOUT,
@@ -109,18 +129,33 @@ async def get_currency_rates(date: str | None = None):
         ) from err
 
 
+@router.get("/cache/stats")
+async def get_currency_cache_stats():
+    return rates_cache.stats()
+
+
+@router.get("/upstream/stats")
+async def get_currency_upstream_stats():
+    return {
+        "cbr": cbr_breaker.stats(),
+        "fallback": fallback_breaker.stats(),
+        "hedging": hedge_stats.stats(),
+    }
+
+
 @router.get("/convert")
 async def convert_currency(
     amount: float,
     from_currency: str,
     to_currency: str,
     date: str | None = None,
+    fetcher: RatesFetcher = Depends(get_rates_fetcher),
 ):
     if from_currency == to_currency:
         return {"amount": amount, "from": from_currency, "to": to_currency, "converted": amount}
 
     try:
-        rates_data = await get_currency_rates(date)
+        rates_data = await get_currency_rates(date, fetcher)
         rates = rates_data["rates"]
 
         if from_currency not in rates or to_currency not in rates:
@@ -156,3 +191,37 @@ async def convert_currency(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error converting currency: {error_msg}",
         ) from err
+
+
+@router.post("/convert/batch", response_model=CurrencyConvertBatchResponse)
+async def convert_currency_batch(
+    batch: CurrencyConvertBatchRequest,
+    fetcher: RatesFetcher = Depends(get_rates_fetcher),
+):
+    if len(batch.amounts) > settings.currency_convert_batch_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many items. Maximum: {settings.currency_convert_batch_max_items}",
+        )
+
+    dates = batch.dates or [None] * len(batch.amounts)
+    try:
+        rate_table, missing = await load_rate_table(fetcher, dates)
+    except httpx.TimeoutException as err:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Currency service timeout",
+        ) from err
+
+    converted = convert_amounts(
+        batch.amounts,
+        batch.from_currencies,
+        batch.to_currency,
+        [rate_key(day) for day in dates],
+        rate_table,
+    )
+    return {
+        "to": batch.to_currency,
+        "converted": [None if np.isnan(value) else float(value) for value in converted],
+        "missing_dates": missing,
+    }
@@ -0,0 +1,92 @@
+from uuid import uuid4
+
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile, status
+from fastapi.responses import FileResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.database import get_db
+from src.core.dependencies import get_current_user
+from src.core.export import export_filename
+from src.core.jobs import JOB_EXPORT, JOB_IMPORT, enqueue_job, job_path, save_upload
+from src.models.job import JOB_SUCCEEDED, Job
+from src.models.user import User
+from src.schemas.job import JobResponse
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+def _job_response(request: Request, job: Job) -> JobResponse:
+    response = JobResponse.model_validate(job)
+    if job.artifact_file:
+        response.artifact_url = str(request.url_for("download_job_artifact", job_id=job.id))
+    return response
+
+
+async def _get_job(db: AsyncSession, job_id: int, user_id: int) -> Job:
+    result = await db.execute(select(Job).filter(Job.id == job_id, Job.user_id == user_id))
+    job = result.scalar_one_or_none()
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found",
+        )
+
+    return job
+
+
+@router.post("/export", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_export_job(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    job = await enqueue_job(db, user_id=current_user.id, kind=JOB_EXPORT)
+    request.app.state.job_runner.notify()
+    return _job_response(request, job)
+
+
+@router.post("/import", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_import_job(
+    request: Request,
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    input_file = f"import-{uuid4().hex}.json"
+    await save_upload(file, input_file)
+    job = await enqueue_job(db, user_id=current_user.id, kind=JOB_IMPORT, input_file=input_file)
+    request.app.state.job_runner.notify()
+    return _job_response(request, job)
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return _job_response(request, await _get_job(db, job_id, current_user.id))
+
+
+@router.get("/{job_id}/artifact")
+async def download_job_artifact(
+    job_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    job = await _get_job(db, job_id, current_user.id)
+
+    if job.status != JOB_SUCCEEDED or not job.artifact_file:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job has no artifact",
+        )
+
+    return FileResponse(
+        job_path(job.artifact_file),
+        media_type="application/json",
+        filename=export_filename(f"fintrack_{job.kind}", "json"),
+    )
@@ -0,0 +1,97 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.database import get_db
+from src.core.dependencies import get_current_user
+from src.core.pagination import decode_cursor, encode_cursor
+from src.models.category import Category
+from src.models.transaction import Transaction
+from src.models.user import User
+from src.schemas.sync import SyncChangesResponse
+
+router = APIRouter(prefix="/sync", tags=["Sync"])
+
+
+async def _changed_rows(
+    db: AsyncSession,
+    model: type[Transaction] | type[Category],
+    *,
+    user_id: int,
+    after: tuple[int, int],
+    limit: int,
+    seen_version: int,
+) -> tuple[list, tuple[int, int], bool]:
+    result = await db.execute(
+        select(model)
+        .filter(
+            model.user_id == user_id,
+            tuple_(model.change_seq, model.id) > tuple_(*after),
+        )
+        .order_by(model.change_seq, model.id)
+        .limit(limit + 1)
+    )
+    rows = result.scalars().all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if rows:
+        after = (rows[-1].change_seq, rows[-1].id)
+    if not has_more:
+        # Caught up: later writes get a change_seq above seen_version. Moving the cursor
+        # there keeps it ahead of purged tombstones even when the table has no rows.
+        after = max(after, (seen_version + 1, 0))
+    return rows, after, has_more
+
+
+@router.get("/changes", response_model=SyncChangesResponse)
+async def get_changes(
+    *,
+    since: str | None = None,
+    limit: int = Query(500, ge=1, le=5000),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    # No cursor: the whole data set, page by page. Clients pass the returned cursor as
+    # `since` on the next call and keep calling while has_more is true.
+    position = decode_cursor(since, 4) if since else [0, 0, 0, 0]
+    if not all(isinstance(value, int) for value in position):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+    # Tombstones after the cursor may have been purged: start over, and tell the client to
+    # replace its local data with what follows
+    purged_seq = current_user.tombstones_purged_seq
+    reset = bool(since and purged_seq) and min(position[0], position[2]) <= purged_seq
+    if reset:
+        position = [0, 0, 0, 0]
+    seen_version = current_user.data_version
+
+    transactions, transactions_after, transactions_more = await _changed_rows(
+        db,
+        Transaction,
+        user_id=current_user.id,
+        after=(position[0], position[1]),
+        limit=limit,
+        seen_version=seen_version,
+    )
+    categories, categories_after, categories_more = await _changed_rows(
+        db,
+        Category,
+        user_id=current_user.id,
+        after=(position[2], position[3]),
+        limit=limit,
+        seen_version=seen_version,
+    )
+
+    return {
+        "cursor": encode_cursor([*transactions_after, *categories_after]),
+        "has_more": transactions_more or categories_more,
+        "reset": reset,
+        "transactions": [txn for txn in transactions if txn.deleted_at is None],
+        "categories": [cat for cat in categories if cat.deleted_at is None],
+        "deleted_transaction_ids": [txn.id for txn in transactions if txn.deleted_at is not None],
+        "deleted_category_ids": [cat.id for cat in categories if cat.deleted_at is not None],
+    }
@@ -1,18 +1,112 @@
-from datetime import datetime
+from collections.abc import AsyncIterator, Callable, Sequence
+import csv
+from datetime import UTC, date, datetime
+import io
+import re
+from typing import Any
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+import httpx
+import numpy as np
+from pydantic import ValidationError
+from sqlalchemy import (
+    ColumnElement,
+    Date,
+    DateTime,
+    Row,
+    Select,
+    cast,
+    func,
+    insert,
+    literal,
+    literal_column,
+    or_,
+    select,
+    tuple_,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 
-from src.core.database import get_db
-from src.core.dependencies import get_current_user
+from src.core.changes import next_change_seq
+from src.core.conditional import check_not_modified, user_etag
+from src.core.config import settings
+from src.core.database import get_db, get_session_factory, has_pg_trgm
+from src.core.dependencies import get_current_user, get_rates_fetcher_factory
+from src.core.export import compact_json, export_filename, stream_chunks
+from src.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, page_limit
+from src.core.rates import RatesFetcher, convert_amounts, load_rate_table, rate_key
+from src.core.rollups import (
+    RollupDeltas,
+    apply_rollup_deltas,
+    is_day_aligned,
+    rollup_day_range,
+)
+from src.core.writes import update_owned, update_owned_with_previous
 from src.models.category import Category
-from src.models.transaction import Transaction
+from src.models.transaction import SEARCH_CONFIG, Transaction, description_document
+from src.models.transaction_rollup import TransactionDailyRollup
 from src.models.user import User
-from src.schemas.transaction import TransactionCreate, TransactionResponse, TransactionUpdate
+from src.schemas.transaction import (
+    TransactionBulkCreate,
+    TransactionBulkDelete,
+    TransactionBulkDeleteResponse,
+    TransactionBulkError,
+    TransactionBulkResponse,
+    TransactionBulkUpdate,
+    TransactionBulkUpdateItem,
+    TransactionCreate,
+    TransactionResponse,
+    TransactionSummaryResponse,
+    TransactionUpdate,
+)
 
 router = APIRouter(prefix="/transactions", tags=["Transactions"])
 
+_UPDATABLE_FIELDS = (
+    "amount",
+    "currency",
+    "description",
+    "transaction_type",
+    "category_id",
+    "transaction_date",
+)
+_REQUIRED_FIELDS = ("amount", "currency", "transaction_type")
+_SEARCH_WORD = re.compile(r"\w+")
+
+
+async def _with_converted_amounts(
+    transactions: list[Transaction],
+    display_currency: str,
+    fetcher: RatesFetcher,
+) -> list[TransactionResponse]:
+    keys = [
+        rate_key(txn.transaction_date.date() if txn.transaction_date else None)
+        for txn in transactions
+    ]
+    try:
+        rate_table, _ = await load_rate_table(
+            fetcher, {date.fromisoformat(key) if key else None for key in keys}
+        )
+    except (HTTPException, httpx.HTTPError):
+        rate_table = {}
+
+    converted = convert_amounts(
+        [txn.amount for txn in transactions],
+        [txn.currency for txn in transactions],
+        display_currency,
+        keys,
+        rate_table,
+    )
+    return [
+        TransactionResponse.model_validate(txn).model_copy(
+            update={"converted_amount": None if np.isnan(value) else float(value)}
+        )
+        for txn, value in zip(transactions, converted, strict=True)
+    ]
+
 
 @router.post("", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED)
 async def create_transaction(
@@ -25,6 +119,7 @@ async def create_transaction(
             select(Category).filter(
                 Category.id == transaction_data.category_id,
                 Category.user_id == current_user.id,
+                Category.deleted_at.is_(None),
             )
         )
         category = result.scalar_one_or_none()
@@ -37,45 +132,737 @@ async def create_transaction(
     new_transaction = Transaction(
         **transaction_data.model_dump(),
         user_id=current_user.id,
+        change_seq=await next_change_seq(db, current_user),
     )
 
     db.add(new_transaction)
+    await db.flush()
+
+    deltas = RollupDeltas()
+    deltas.add_transaction(new_transaction)
+    await apply_rollup_deltas(db, deltas)
+
     await db.commit()
     await db.refresh(new_transaction)
 
     return new_transaction
 
 
+def _filter_transactions(
+    query: Select,
+    *,
+    user_id: int,
+    transaction_type: str | None,
+    category_id: int | None,
+    start_date: datetime | None,
+    end_date: datetime | None,
+) -> Select:
+    query = query.filter(Transaction.user_id == user_id, Transaction.deleted_at.is_(None))
+
+    if transaction_type:
+        query = query.filter(Transaction.transaction_type == transaction_type)
+
+    if category_id:
+        query = query.filter(Transaction.category_id == category_id)
+
+    if start_date:
+        query = query.filter(Transaction.transaction_date >= start_date)
+
+    if end_date:
+        query = query.filter(Transaction.transaction_date <= end_date)
+
+    return query
+
+
 @router.get("", response_model=list[TransactionResponse])
 async def get_transactions(
+    request: Request,
+    response: Response,
+    *,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Depends(page_limit),
+    cursor: str | None = None,
     transaction_type: str | None = Query(None, pattern="^(income|expense)$"),
     category_id: int | None = None,
     start_date: datetime | None = None,
     end_date: datetime | None = None,
+    display_currency: str | None = Query(None, pattern="^(RUB|USD|EUR|AED)$"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    rates_fetcher: Callable[[], RatesFetcher] = Depends(get_rates_fetcher_factory),
 ):
-    query = select(Transaction).filter(Transaction.user_id == current_user.id)
+    # Converted amounts follow the latest rates, so only unconverted lists get an ETag
+    if not display_currency:
+        not_modified = check_not_modified(request, response, user_etag(request, current_user))
+        if not_modified:
+            return not_modified
 
-    if transaction_type:
-        query = query.filter(Transaction.transaction_type == transaction_type)
+    query = _filter_transactions(
+        select(Transaction),
+        user_id=current_user.id,
+        transaction_type=transaction_type,
+        category_id=category_id,
+        start_date=start_date,
+        end_date=end_date,
+    ).order_by(Transaction.transaction_date.desc(), Transaction.id.desc())
 
-    if category_id:
-        query = query.filter(Transaction.category_id == category_id)
+    if cursor:
+        cursor_date, cursor_id = decode_cursor(cursor, 2)
+        try:
+            cursor_date = datetime.fromisoformat(cursor_date)
+        except (TypeError, ValueError) as err:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            ) from err
+        if not isinstance(cursor_id, int):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
+        query = query.filter(
+            tuple_(Transaction.transaction_date, Transaction.id) < tuple_(cursor_date, cursor_id),
+            # Implied by the row comparison; lets partitioned tables skip later months
+            Transaction.transaction_date <= cursor_date,
+        )
+    elif skip:
+        query = query.offset(skip)
 
-    if start_date:
-        query = query.filter(Transaction.transaction_date >= start_date)
+    result = await db.execute(query.limit(limit + 1))
+    transactions = result.scalars().all()
 
-    if end_date:
-        query = query.filter(Transaction.transaction_date <= end_date)
+    if len(transactions) > limit:
+        transactions = transactions[:limit]
+        last = transactions[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            [last.transaction_date.isoformat(), last.id]
+        )
 
-    result = await db.execute(query.offset(skip).limit(limit))
-    transactions = result.scalars().all()
+    if display_currency and transactions:
+        return await _with_converted_amounts(transactions, display_currency, rates_fetcher())
     return transactions
 
 
+def _period(dialect_name: str, granularity: str, value) -> ColumnElement:
+    """First day of the day/week/month/year of ``value``, a local timestamp or a date."""
+    if dialect_name == "postgresql":
+        # Without the cast a date would be truncated as a timestamptz in the session time zone
+        return cast(func.date_trunc(granularity, cast(value, DateTime)), Date)
+    # SQLite: weeks start on Monday, as with date_trunc
+    modifiers = {
+        "day": [],
+        "week": ["weekday 0", "-6 days"],
+        "month": ["start of month"],
+        "year": ["start of year"],
+    }[granularity]
+    return func.date(value, *modifiers, type_=Date)
+
+
+async def _summary_from_transactions(
+    db: AsyncSession,
+    *,
+    user_id: int,
+    granularity: str,
+    tz: str,
+    transaction_type: str | None,
+    category_id: int | None,
+    start_date: datetime | None,
+    end_date: datetime | None,
+) -> tuple[list[dict], list[dict]]:
+    filters = {
+        "user_id": user_id,
+        "transaction_type": transaction_type,
+        "category_id": category_id,
+        "start_date": start_date,
+        "end_date": end_date,
+    }
+    total = func.sum(Transaction.amount).label("total")
+    count = func.count().label("count")
+
+    by_category = (
+        await db.execute(
+            _filter_transactions(
+                select(
+                    Transaction.category_id,
+                    Transaction.transaction_type,
+                    Transaction.currency,
+                    total,
+                    count,
+                ),
+                **filters,
+            ).group_by(Transaction.category_id, Transaction.transaction_type, Transaction.currency)
+        )
+    ).all()
+
+    dialect_name = db.get_bind().dialect.name
+    # SQLite stores naive UTC timestamps and has no time zone conversion
+    local_date = (
+        func.timezone(tz, Transaction.transaction_date)
+        if dialect_name == "postgresql"
+        else Transaction.transaction_date
+    )
+    period = _period(dialect_name, granularity, local_date)
+    by_period = (
+        await db.execute(
+            _filter_transactions(
+                select(
+                    period.label("period"),
+                    Transaction.transaction_type,
+                    Transaction.currency,
+                    total,
+                    count,
+                ),
+                **filters,
+            )
+            .group_by(period, Transaction.transaction_type, Transaction.currency)
+            .order_by(period)
+        )
+    ).all()
+
+    return (
+        [row._asdict() for row in by_category],
+        [row._asdict() for row in by_period],
+    )
+
+
+async def _summary_from_rollups(
+    db: AsyncSession,
+    *,
+    user_id: int,
+    granularity: str,
+    transaction_type: str | None,
+    category_id: int | None,
+    start_date: datetime | None,
+    end_date: datetime | None,
+) -> tuple[list[dict], list[dict]]:
+    query_filters = [
+        TransactionDailyRollup.user_id == user_id,
+        rollup_day_range(start_date, end_date),
+    ]
+    if transaction_type:
+        query_filters.append(TransactionDailyRollup.transaction_type == transaction_type)
+    if category_id:
+        query_filters.append(TransactionDailyRollup.category_id == category_id)
+
+    total = func.sum(TransactionDailyRollup.total).label("total")
+    count = func.sum(TransactionDailyRollup.count).label("count")
+
+    by_category = (
+        await db.execute(
+            select(
+                TransactionDailyRollup.category_id,
+                TransactionDailyRollup.transaction_type,
+                TransactionDailyRollup.currency,
+                total,
+                count,
+            )
+            .filter(*query_filters)
+            .group_by(
+                TransactionDailyRollup.category_id,
+                TransactionDailyRollup.transaction_type,
+                TransactionDailyRollup.currency,
+            )
+        )
+    ).all()
+
+    period = _period(db.get_bind().dialect.name, granularity, TransactionDailyRollup.day)
+    by_period = (
+        await db.execute(
+            select(
+                period.label("period"),
+                TransactionDailyRollup.transaction_type,
+                TransactionDailyRollup.currency,
+                total,
+                count,
+            )
+            .filter(*query_filters)
+            .group_by(
+                period, TransactionDailyRollup.transaction_type, TransactionDailyRollup.currency
+            )
+            .order_by(period)
+        )
+    ).all()
+
+    return (
+        [
+            {**row._asdict(), "category_id": row.category_id or None}
+            for row in by_category
+            if row.count
+        ],
+        [row._asdict() for row in by_period if row.count],
+    )
+
+
+@router.get("/summary", response_model=TransactionSummaryResponse)
+async def get_transactions_summary(
+    *,
+    granularity: str = Query("month", pattern="^(day|week|month|year)$"),
+    tz: str = "UTC",
+    transaction_type: str | None = Query(None, pattern="^(income|expense)$"),
+    category_id: int | None = None,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    try:
+        ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError) as err:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unknown timezone",
+        ) from err
+
+    if is_day_aligned(start_date, end_date, tz):
+        by_category, by_period = await _summary_from_rollups(
+            db,
+            user_id=current_user.id,
+            granularity=granularity,
+            transaction_type=transaction_type,
+            category_id=category_id,
+            start_date=start_date,
+            end_date=end_date,
+        )
+    else:
+        if tz != "UTC" and db.get_bind().dialect.name != "postgresql":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Time zones other than UTC need a PostgreSQL database",
+            )
+        by_category, by_period = await _summary_from_transactions(
+            db,
+            user_id=current_user.id,
+            granularity=granularity,
+            tz=tz,
+            transaction_type=transaction_type,
+            category_id=category_id,
+            start_date=start_date,
+            end_date=end_date,
+        )
+
+    totals: dict[tuple[str, str], dict] = {}
+    for row in by_category:
+        item = totals.setdefault(
+            (row["transaction_type"], row["currency"]),
+            {
+                "transaction_type": row["transaction_type"],
+                "currency": row["currency"],
+                "total": 0.0,
+                "count": 0,
+            },
+        )
+        item["total"] += row["total"]
+        item["count"] += row["count"]
+
+    return {
+        "granularity": granularity,
+        "timezone": tz,
+        "totals": list(totals.values()),
+        "by_category": by_category,
+        "by_period": by_period,
+    }
+
+
+@router.get("/search", response_model=list[TransactionResponse])
+async def search_transactions(
+    response: Response,
+    *,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None,
+    transaction_type: str | None = Query(None, pattern="^(income|expense)$"),
+    category_id: int | None = None,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Transactions whose description matches ``q``, best match first.
+
+    Every match is ranked before the page is cut, so the cost grows with the number of the
+    user's rows that match: rare words are fast, a word in most of the user's descriptions
+    is not.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        document = description_document()
+        search_query = func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), q)
+        rank = func.ts_rank(document, search_query)
+        if has_pg_trgm():
+            # Substring and typo matches rank by trigram similarity; both use the trigram index
+            rank += func.word_similarity(q, Transaction.description)
+            matches = or_(
+                document.op("@@")(search_query),
+                Transaction.description.icontains(q, autoescape=True),
+                literal(q).op("<%")(Transaction.description),
+            )
+        else:
+            # Without a trigram index ILIKE scans all of the user's rows; match word
+            # prefixes instead so the full-text index still applies
+            words = _SEARCH_WORD.findall(q)
+            if words:
+                prefixes = func.to_tsquery(
+                    literal_column(f"'{SEARCH_CONFIG}'::regconfig"),
+                    " & ".join(f"{word}:*" for word in words),
+                )
+                search_query = search_query.op("||")(prefixes)
+            matches = document.op("@@")(search_query)
+    else:
+        rank = literal(0.0)
+        matches = Transaction.description.icontains(q, autoescape=True)
+
+    query = (
+        _filter_transactions(
+            select(Transaction, rank.label("rank")),
+            user_id=current_user.id,
+            transaction_type=transaction_type,
+            category_id=category_id,
+            start_date=start_date,
+            end_date=end_date,
+        )
+        .filter(matches)
+        .order_by(rank.desc(), Transaction.id.desc())
+    )
+
+    if cursor:
+        cursor_rank, cursor_id = decode_cursor(cursor, 2)
+        if not isinstance(cursor_rank, int | float) or not isinstance(cursor_id, int):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
+        query = query.filter(tuple_(rank, Transaction.id) < tuple_(cursor_rank, cursor_id))
+
+    rows = (await db.execute(query.limit(limit + 1))).all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([last.rank, last.Transaction.id])
+
+    return [row.Transaction for row in rows]
+
+
+_EXPORT_COLUMNS = (
+    Transaction.id,
+    Transaction.amount,
+    Transaction.currency,
+    Transaction.description,
+    Transaction.transaction_type,
+    Transaction.category_id,
+    Transaction.transaction_date,
+    Transaction.created_at,
+    Transaction.updated_at,
+)
+_EXPORT_FIELDS = [column.key for column in _EXPORT_COLUMNS]
+_EXPORT_MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def _export_value(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _csv_chunk(rows: Sequence[Sequence]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_export_value(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+def _ndjson_chunk(rows: Sequence[Row]) -> str:
+    return "".join(compact_json(dict(zip(_EXPORT_FIELDS, row, strict=True))) + "\n" for row in rows)
+
+
+async def _export_lines(
+    query: Select, export_format: str, session_factory: sessionmaker
+) -> AsyncIterator[str]:
+    if export_format == "csv":
+        yield _csv_chunk([_EXPORT_FIELDS])
+    encode = _csv_chunk if export_format == "csv" else _ndjson_chunk
+    async with session_factory() as db:
+        async for rows in stream_chunks(query, db):
+            yield encode(rows)
+
+
+@router.get("/export")
+async def export_transactions(
+    *,
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    transaction_type: str | None = Query(None, pattern="^(income|expense)$"),
+    category_id: int | None = None,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    session_factory: sessionmaker = Depends(get_session_factory),
+    current_user: User = Depends(get_current_user),
+):
+    query = _filter_transactions(
+        select(*_EXPORT_COLUMNS),
+        user_id=current_user.id,
+        transaction_type=transaction_type,
+        category_id=category_id,
+        start_date=start_date,
+        end_date=end_date,
+    ).order_by(Transaction.transaction_date.desc(), Transaction.id.desc())
+
+    filename = export_filename("fintrack_transactions", export_format)
+    return StreamingResponse(
+        _export_lines(query, export_format, session_factory),
+        media_type=_EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _check_bulk_size(count: int) -> None:
+    if count > settings.transactions_bulk_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many items. Maximum: {settings.transactions_bulk_max_items}",
+        )
+
+
+def _validation_detail(err: ValidationError) -> str:
+    return "; ".join(
+        ".".join(str(part) for part in error["loc"]) + f": {error['msg']}"
+        if error["loc"]
+        else error["msg"]
+        for error in err.errors()
+    )
+
+
+async def _owned_category_ids(db: AsyncSession, user_id: int, category_ids: set[int]) -> set[int]:
+    if not category_ids:
+        return set()
+    result = await db.execute(
+        select(Category.id).filter(
+            Category.user_id == user_id,
+            Category.id.in_(category_ids),
+            Category.deleted_at.is_(None),
+        )
+    )
+    return set(result.scalars().all())
+
+
+@router.post("/bulk", response_model=TransactionBulkResponse)
+async def create_transactions_bulk(
+    batch: TransactionBulkCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    _check_bulk_size(len(batch.items))
+    errors: list[TransactionBulkError] = []
+
+    valid: list[tuple[int, TransactionCreate]] = []
+    for index, item in enumerate(batch.items):
+        try:
+            valid.append((index, TransactionCreate.model_validate(item)))
+        except ValidationError as err:
+            errors.append(TransactionBulkError(index=index, detail=_validation_detail(err)))
+
+    categories = await _owned_category_ids(
+        db, current_user.id, {data.category_id for _, data in valid if data.category_id}
+    )
+
+    now = datetime.now(UTC)
+    rows = []
+    for index, data in valid:
+        if data.category_id and data.category_id not in categories:
+            errors.append(TransactionBulkError(index=index, detail="Category not found"))
+            continue
+        rows.append(
+            {
+                **data.model_dump(),
+                "category_id": data.category_id or None,
+                "transaction_date": data.transaction_date or now,
+                "user_id": current_user.id,
+            }
+        )
+
+    created: list[Transaction] = []
+    if rows:
+        change_seq = await next_change_seq(db, current_user)
+        for row in rows:
+            row["change_seq"] = change_seq
+        result = await db.scalars(
+            insert(Transaction).returning(Transaction, sort_by_parameter_order=True), rows
+        )
+        created = list(result.all())
+
+        deltas = RollupDeltas()
+        for transaction in created:
+            deltas.add_transaction(transaction)
+        await apply_rollup_deltas(db, deltas)
+        await db.commit()
+
+    errors.sort(key=lambda error: error.index)
+    return {"items": created, "errors": errors}
+
+
+@router.patch("/bulk", response_model=TransactionBulkResponse)
+async def update_transactions_bulk(
+    batch: TransactionBulkUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    _check_bulk_size(len(batch.items))
+    errors: list[TransactionBulkError] = []
+
+    valid: list[tuple[int, int, dict]] = []
+    for index, item in enumerate(batch.items):
+        try:
+            data = TransactionBulkUpdateItem.model_validate(item)
+        except ValidationError as err:
+            item_id = item.get("id")
+            errors.append(
+                TransactionBulkError(
+                    index=index,
+                    id=item_id if isinstance(item_id, int) else None,
+                    detail=_validation_detail(err),
+                )
+            )
+            continue
+
+        update_data = data.model_dump(exclude_unset=True, exclude={"id"})
+        null_fields = [
+            field
+            for field in _REQUIRED_FIELDS
+            if field in update_data and update_data[field] is None
+        ]
+        if null_fields:
+            errors.append(
+                TransactionBulkError(
+                    index=index, id=data.id, detail=f"{', '.join(null_fields)} cannot be null"
+                )
+            )
+            continue
+        if "category_id" in update_data:
+            update_data["category_id"] = update_data["category_id"] or None
+        valid.append((index, data.id, update_data))
+
+    existing = {}
+    if valid:
+        result = await db.execute(
+            select(Transaction.__table__).filter(
+                Transaction.user_id == current_user.id,
+                Transaction.id.in_({txn_id for _, txn_id, _ in valid}),
+                Transaction.deleted_at.is_(None),
+            )
+        )
+        existing = {row.id: dict(row._mapping) for row in result}
+
+    categories = await _owned_category_ids(
+        db,
+        current_user.id,
+        {data["category_id"] for _, _, data in valid if data.get("category_id")},
+    )
+
+    now = datetime.now(UTC)
+    updated: dict[int, dict] = {}
+    for index, txn_id, update_data in valid:
+        if txn_id not in existing:
+            errors.append(
+                TransactionBulkError(index=index, id=txn_id, detail="Transaction not found")
+            )
+            continue
+        category_id = update_data.get("category_id")
+        if category_id and category_id not in categories:
+            errors.append(TransactionBulkError(index=index, id=txn_id, detail="Category not found"))
+            continue
+        # Repeated ids apply in order on top of each other
+        updated[txn_id] = {
+            **updated.get(txn_id, existing[txn_id]),
+            **update_data,
+            "updated_at": now,
+            "fingerprint": None,
+        }
+
+    if updated:
+        change_seq = await next_change_seq(db, current_user)
+        for row in updated.values():
+            row["change_seq"] = change_seq
+        await db.execute(
+            update(Transaction),
+            [
+                {
+                    column: row[column]
+                    for column in (
+                        "id",
+                        *_UPDATABLE_FIELDS,
+                        "updated_at",
+                        "change_seq",
+                        "fingerprint",
+                    )
+                }
+                for row in updated.values()
+            ],
+        )
+
+        deltas = RollupDeltas()
+        for txn_id, row in updated.items():
+            deltas.add_row(existing[txn_id], sign=-1)
+            deltas.add_row(row)
+        await apply_rollup_deltas(db, deltas)
+        await db.commit()
+
+    errors.sort(key=lambda error: error.index)
+    return {"items": list(updated.values()), "errors": errors}
+
+
+@router.delete("/bulk", response_model=TransactionBulkDeleteResponse)
+async def delete_transactions_bulk(
+    batch: TransactionBulkDelete,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    _check_bulk_size(len(batch.ids))
+    if not batch.ids:
+        return {"deleted_ids": [], "errors": []}
+
+    now = datetime.now(UTC)
+    result = await db.execute(
+        update(Transaction)
+        .where(
+            Transaction.user_id == current_user.id,
+            Transaction.id.in_(set(batch.ids)),
+            Transaction.deleted_at.is_(None),
+        )
+        .values(
+            deleted_at=now,
+            updated_at=now,
+            change_seq=await next_change_seq(db, current_user),
+            fingerprint=None,
+        )
+        .returning(
+            Transaction.id,
+            Transaction.user_id,
+            Transaction.transaction_date,
+            Transaction.category_id,
+            Transaction.currency,
+            Transaction.transaction_type,
+            Transaction.amount,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    rows = result.all()
+
+    if rows:
+        deltas = RollupDeltas()
+        for row in rows:
+            deltas.add_row(row._mapping, sign=-1)
+        await apply_rollup_deltas(db, deltas)
+        await db.commit()
+    else:
+        # Nothing changed: drop the data_version bump
+        await db.rollback()
+
+    deleted = {row.id for row in rows}
+    return {
+        "deleted_ids": [txn_id for txn_id in dict.fromkeys(batch.ids) if txn_id in deleted],
+        "errors": [
+            TransactionBulkError(index=index, id=txn_id, detail="Transaction not found")
+            for index, txn_id in enumerate(batch.ids)
+            if txn_id not in deleted
+        ],
+    }
+
+
 @router.get("/{transaction_id}", response_model=TransactionResponse)
 async def get_transaction(
     transaction_id: int,
@@ -84,7 +871,9 @@ async def get_transaction(
 ):
     result = await db.execute(
         select(Transaction).filter(
-            Transaction.id == transaction_id, Transaction.user_id == current_user.id
+            Transaction.id == transaction_id,
+            Transaction.user_id == current_user.id,
+            Transaction.deleted_at.is_(None),
         )
     )
     transaction = result.scalar_one_or_none()
@@ -105,19 +894,6 @@ async def update_transaction(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    result = await db.execute(
-        select(Transaction).filter(
-            Transaction.id == transaction_id, Transaction.user_id == current_user.id
-        )
-    )
-    transaction = result.scalar_one_or_none()
-
-    if not transaction:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Transaction not found",
-        )
-
     update_data = transaction_update.model_dump(exclude_unset=True)
 
     if update_data.get("category_id"):
@@ -125,6 +901,7 @@ async def update_transaction(
             select(Category).filter(
                 Category.id == update_data["category_id"],
                 Category.user_id == current_user.id,
+                Category.deleted_at.is_(None),
             )
         )
         category = result.scalar_one_or_none()
@@ -134,11 +911,31 @@ async def update_transaction(
                 detail="Category not found",
             )
 
-    for field, value in update_data.items():
-        setattr(transaction, field, value)
+    rows = await update_owned_with_previous(
+        db,
+        Transaction,
+        row_id=transaction_id,
+        user_id=current_user.id,
+        values={
+            **update_data,
+            "change_seq": await next_change_seq(db, current_user),
+            "fingerprint": None,
+        },
+    )
+
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Transaction not found",
+        )
+
+    previous, transaction = rows
+    deltas = RollupDeltas()
+    deltas.add_row(previous, sign=-1)
+    deltas.add_row(transaction)
+    await apply_rollup_deltas(db, deltas)
 
     await db.commit()
-    await db.refresh(transaction)
 
     return transaction
 
@@ -149,12 +946,17 @@ async def delete_transaction(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    result = await db.execute(
-        select(Transaction).filter(
-            Transaction.id == transaction_id, Transaction.user_id == current_user.id
-        )
+    transaction = await update_owned(
+        db,
+        Transaction,
+        row_id=transaction_id,
+        user_id=current_user.id,
+        values={
+            "deleted_at": datetime.now(UTC),
+            "change_seq": await next_change_seq(db, current_user),
+            "fingerprint": None,
+        },
     )
-    transaction = result.scalar_one_or_none()
 
     if not transaction:
         raise HTTPException(
@@ -162,5 +964,8 @@ async def delete_transaction(
             detail="Transaction not found",
         )
 
-    await db.delete(transaction)
+    deltas = RollupDeltas()
+    deltas.add_row(transaction, sign=-1)
+    await apply_rollup_deltas(db, deltas)
+
     await db.commit()
@@ -0,0 +1,55 @@
+"""Deleting the data of an account that is being removed.
+
+Rows go in set-based DELETE statements of at most ``account_purge_batch_rows`` rows, each
+committed on its own, so a large account is never loaded into memory and no transaction
+holds its locks for the whole purge. An interrupted purge continues when run again.
+"""
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.core.progress import ProgressCallback
+from src.models.category import Category
+from src.models.refresh_token import RefreshToken
+from src.models.transaction import Transaction
+from src.models.transaction_rollup import TransactionDailyRollup
+
+
+async def _delete_in_batches(db: AsyncSession, model, user_id: int, on_rows) -> None:
+    batch_rows = settings.account_purge_batch_rows
+    while True:
+        batch = select(model.id).filter(model.user_id == user_id).limit(batch_rows)
+        result = await db.execute(
+            delete(model).where(model.user_id == user_id, model.id.in_(batch))
+        )
+        await db.commit()
+        await on_rows(result.rowcount)
+        if result.rowcount < batch_rows:
+            return
+
+
+async def purge_user_data(
+    db: AsyncSession, user_id: int, on_progress: ProgressCallback | None = None
+) -> int:
+    """Delete the transactions, categories, rollups and refresh tokens of a user.
+
+    Commits after every batch and returns the number of deleted rows. The caller then
+    deletes the user's jobs and the user row.
+    """
+    deleted = 0
+
+    async def on_rows(count: int) -> None:
+        nonlocal deleted
+        deleted += count
+        if on_progress:
+            await on_progress(deleted)
+
+    # Transactions first: they refer to the categories
+    await _delete_in_batches(db, Transaction, user_id, on_rows)
+    await _delete_in_batches(db, Category, user_id, on_rows)
+    # Few rows per user: one per day and category, one per session
+    for model in (TransactionDailyRollup, RefreshToken):
+        await db.execute(delete(model).where(model.user_id == user_id))
+    await db.commit()
+    return deleted
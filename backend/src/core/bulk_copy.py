@@ -0,0 +1,41 @@
+"""Bulk loading with PostgreSQL COPY, available when the engine runs on asyncpg."""
+
+from collections.abc import Iterable, Sequence
+
+from sqlalchemy import Column, MetaData, Table
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.schema import CreateTable
+
+# Kept apart from Base.metadata so sync_schema never creates staging tables
+_staging_metadata = MetaData()
+
+
+def supports_copy(db: AsyncSession) -> bool:
+    return db.get_bind().dialect.driver == "asyncpg"
+
+
+def staging_table(name: str, *columns: Column) -> Table:
+    """A temporary table, dropped when the transaction that created it ends."""
+    return Table(
+        name,
+        _staging_metadata,
+        *columns,
+        prefixes=["TEMPORARY"],
+        postgresql_on_commit="DROP",
+    )
+
+
+async def create_staging_table(db: AsyncSession, table: Table) -> None:
+    await db.execute(CreateTable(table))
+
+
+async def copy_records(db: AsyncSession, table: Table, records: Iterable[Sequence]) -> None:
+    """COPY ``records``, tuples in the order of ``table.columns``, into ``table``.
+
+    Runs on the session's connection, inside its transaction.
+    """
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        table.name, records=records, columns=[column.name for column in table.columns]
+    )
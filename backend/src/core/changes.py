@@ -0,0 +1,27 @@
+"""Per-user change tracking for delta sync and ETags.
+
+Every write to a user's profile, transactions or categories bumps ``users.data_version``, and
+rows it touches are stamped with the new value as ``change_seq``. The bump locks the user row
+until commit, so a user's writes become visible in ``change_seq`` order and a client that has
+seen everything up to N only needs the rows with a greater ``change_seq``.
+"""
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from src.models.user import User
+
+
+async def next_change_seq(db: AsyncSession, user: User) -> int:
+    result = await db.execute(
+        update(User)
+        .where(User.id == user.id)
+        # Keep updated_at: it describes the profile, not the user's data
+        .values(data_version=User.data_version + 1, updated_at=User.updated_at)
+        .returning(User.data_version)
+        .execution_options(synchronize_session=False)
+    )
+    version = result.scalar_one()
+    set_committed_value(user, "data_version", version)
+    return version
@@ -0,0 +1,36 @@
+import hashlib
+
+from fastapi import Request, Response, status
+
+from src.models.user import User
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def user_etag(request: Request, user: User) -> str:
+    """Weak ETag for a per-user response: the user's data_version plus path and query."""
+    query = hashlib.sha1(
+        repr((request.url.path, sorted(request.query_params.multi_items()))).encode("utf-8"),
+        usedforsecurity=False,
+    ).hexdigest()[:16]
+    return f'W/"{user.id}-{user.data_version}-{query}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def check_not_modified(request: Request, response: Response, etag: str) -> Response | None:
+    """Return a 304 response when ``If-None-Match`` matches ``etag``, else tag ``response``."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+        )
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return None
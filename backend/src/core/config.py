@@ -17,6 +17,56 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int = 30
     refresh_token_expire_days: int = 7
 
+    http_timeout_seconds: float = 10.0
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry_seconds: float = 30.0
+    http_max_connections_per_host: int = 10
+
+    cbr_api_url: str = "https://www.cbr-xml-daily.ru"
+    fallback_rates_api_url: str = "https://open.er-api.com/v6/latest"
+    rates_sync_enabled: bool = True
+    rates_prefetch_hour_utc: int = 6
+    rates_backfill_concurrency: int = 4
+
+    currency_cache_max_entries: int = 1024
+    currency_cache_today_ttl_seconds: int = 300
+    currency_cache_stale_seconds: int = 86400
+    currency_breaker_failure_threshold: int = 5
+    currency_breaker_reset_seconds: float = 30.0
+    currency_hedge_delay_seconds: float | None = None
+    currency_batch_max_dates: int = 1000
+    currency_batch_concurrency: int = 8
+    currency_convert_batch_max_items: int = 10000
+
+    transactions_bulk_max_items: int = 5000
+
+    # Rows fetched per server-side cursor round trip by streaming exports
+    export_chunk_rows: int = 1000
+    # Rows per INSERT batch in /users/me/import
+    import_batch_rows: int = 1000
+    # Rows per DELETE batch when an account is deleted, see src/core/accounts.py
+    account_purge_batch_rows: int = 10000
+
+    # Background jobs, see src/core/jobs.py. Uploaded inputs and results are files in jobs_dir
+    jobs_dir: Path = BASE_DIR / "var" / "jobs"
+    jobs_concurrency: int = 2
+    jobs_max_attempts: int = 3
+    jobs_artifact_ttl_hours: int = 24
+
+    forecast_cache_max_entries: int = 1024
+
+    # Soft-deleted rows are purged after this many days, see src/core/tombstones.py. Delta
+    # sync clients that have not synced for longer get a full resync.
+    tombstone_retention_days: int = 90
+
+    # Day boundaries of transaction_daily_rollups
+    rollup_timezone: str = "UTC"
+
+    # Monthly range partitions of transactions (PostgreSQL), see src/core/partitions.py
+    transactions_partitioned: bool = False
+    transactions_partition_months_ahead: int = 3
+
     cors_origins: str = (
         "http://localhost:5173,http://localhost:3000,"
         "http://158.160.205.61,http://158.160.205.61:5173"
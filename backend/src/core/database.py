@@ -1,9 +1,17 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import logging
+
+from fastapi import Depends
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateColumn
 
 from src.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 engine = create_async_engine(settings.database_url, echo=settings.debug)
 
 AsyncSessionLocal = sessionmaker(
@@ -16,7 +24,57 @@ AsyncSessionLocal = sessionmaker(
 
 Base = declarative_base()
 
+# Set by sync_schema: whether the pg_trgm extension could be installed
+_pg_trgm_installed = False
+
+
+def has_pg_trgm(*_args, **_kwargs) -> bool:
+    """Also usable as a ``ddl_if`` callable for indexes that need pg_trgm."""
+    return _pg_trgm_installed
+
+
+def get_session_factory() -> sessionmaker:
+    """For work that outlives the request's session, such as a streamed response body."""
+    return AsyncSessionLocal
+
 
-async def get_db():
-    async with AsyncSessionLocal() as session:
+async def get_db(session_factory: sessionmaker = Depends(get_session_factory)):
+    async with session_factory() as session:
         yield session
+
+
+def _add_missing_columns(sync_conn) -> None:
+    inspector = inspect(sync_conn)
+    preparer = sync_conn.dialect.identifier_preparer
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            # NOT NULL columns added here carry a server_default so existing rows stay valid
+            column_spec = CreateColumn(column).compile(dialect=sync_conn.dialect)
+            sync_conn.execute(
+                text(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {column_spec}")
+            )
+
+
+def _create_missing_indexes(sync_conn) -> None:
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
+
+async def sync_schema(conn: AsyncConnection) -> None:
+    """Create missing tables, then columns and indexes added after their table was created."""
+    global _pg_trgm_installed  # noqa: PLW0603
+    if conn.dialect.name == "postgresql":
+        try:
+            async with conn.begin_nested():
+                await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            _pg_trgm_installed = True
+        except DBAPIError as err:
+            logger.warning(f"pg_trgm is not available, fuzzy description search is off: {err}")
+
+    await conn.run_sync(Base.metadata.create_all)
+    await conn.run_sync(_add_missing_columns)
+    await conn.run_sync(_create_missing_indexes)
@@ -1,9 +1,13 @@
-from fastapi import Depends, HTTPException, status
+from collections.abc import Callable
+
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+import httpx
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.database import get_db
+from src.core.rates import RatesFetcher
 from src.core.security import decode_token
 from src.models.user import User
 
@@ -65,3 +69,17 @@ async def get_current_user(
         )
 
     return user
+
+
+def get_http_client(request: Request) -> httpx.AsyncClient:
+    return request.app.state.http_client
+
+
+def get_rates_fetcher(client: httpx.AsyncClient = Depends(get_http_client)) -> RatesFetcher:
+    return RatesFetcher(client)
+
+
+def get_rates_fetcher_factory(request: Request) -> Callable[[], RatesFetcher]:
+    """For endpoints that need rates on some requests only: the app's HTTP client is looked
+    up when the factory is called, not for every request."""
+    return lambda: get_rates_fetcher(get_http_client(request))
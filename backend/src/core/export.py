@@ -0,0 +1,31 @@
+"""Streaming exports: rows are read through a server-side cursor and written chunk by chunk."""
+
+from collections.abc import AsyncIterator, Sequence
+from datetime import UTC, datetime
+import json
+from typing import Any
+
+from sqlalchemy import Row, Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+
+
+async def stream_chunks(query: Select, db: AsyncSession) -> AsyncIterator[Sequence[Row]]:
+    """Yield the rows of ``query`` in chunks of ``export_chunk_rows``.
+
+    A streaming response outlives the request's session: ``db`` comes from the
+    ``get_session_factory`` dependency and is closed by the caller when the body ends.
+    """
+    result = await db.stream(query.execution_options(yield_per=settings.export_chunk_rows))
+    async for chunk in result.partitions():
+        yield chunk
+
+
+def compact_json(value: Any) -> str:
+    """JSON without whitespace; datetimes as ISO 8601."""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=datetime.isoformat)
+
+
+def export_filename(prefix: str, extension: str) -> str:
+    return f"{prefix}_{datetime.now(UTC):%Y%m%d_%H%M%S}.{extension}"
@@ -0,0 +1,255 @@
+"""Daily expense forecasting, ported from ``frontend/src/ml/expensePredictor.ts``.
+
+The feature model (ridge regression plus boosted decision stumps over window-5 features) is
+built with NumPy for the whole history at once. Fitted models are cached per user in
+``forecast_cache`` and reused until the user's data changes.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any
+
+import numpy as np
+
+from src.core.config import settings
+
+FEATURE_WINDOW = 5
+BOOSTING_LEARNING_RATE = 0.4
+MAX_STUMPS = 3
+RIDGE_L2 = 1e-2
+
+
+@dataclass
+class Stump:
+    feature_index: int
+    threshold: float
+    left_value: float
+    right_value: float
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        return np.where(
+            features[..., self.feature_index] <= self.threshold,
+            self.left_value,
+            self.right_value,
+        )
+
+
+def _weekday(days: np.ndarray) -> np.ndarray:
+    # JavaScript Date.getDay(): Sunday is 0; 1970-01-01 was a Thursday
+    return (days.astype("datetime64[D]").astype(np.int64) + 4) % 7
+
+
+def _day_of_month(days: np.ndarray) -> np.ndarray:
+    return (days - days.astype("datetime64[M]").astype("datetime64[D]")).astype(np.int64)
+
+
+def _feature_rows(
+    expenses: np.ndarray,
+    positions: np.ndarray,
+    days: np.ndarray,
+    *,
+    avg_expense: float,
+    baselines: np.ndarray,
+    total_count: int,
+) -> np.ndarray:
+    """Feature vectors for ``days``; the row at position ``p`` sees ``expenses[:p]``."""
+    scale = max(avg_expense, 1.0)
+    padded = np.concatenate([np.zeros(FEATURE_WINDOW), expenses])
+
+    last = np.where(positions >= 1, padded[positions + FEATURE_WINDOW - 1], avg_expense)
+    penultimate = np.where(positions > 1, padded[positions + FEATURE_WINDOW - 2], last)
+
+    offsets = np.arange(-FEATURE_WINDOW, 0)
+    window = padded[positions[:, None] + FEATURE_WINDOW + offsets]
+    counts = np.minimum(positions, FEATURE_WINDOW)
+    in_window = offsets >= -counts[:, None]
+    divisor = np.maximum(counts, 1)
+    rolling_mean = np.where(counts > 0, (window * in_window).sum(axis=1) / divisor, avg_expense)
+    variance = (((window - rolling_mean[:, None]) ** 2) * in_window).sum(axis=1) / divisor
+    rolling_std = np.where(counts > 1, np.sqrt(variance), 0.0)
+
+    first = expenses[0] if len(expenses) else 0.0
+    trend = np.where(positions > 1, (last - first) / np.maximum(positions - 1, 1), 0.0)
+    weekday = _weekday(days)
+    seasonality = baselines[weekday]
+
+    return np.column_stack(
+        [
+            np.ones(len(positions)),
+            last / scale,
+            rolling_mean / scale,
+            (last - penultimate) / scale,
+            rolling_std / scale,
+            trend / scale,
+            seasonality / scale,
+            (last - seasonality) / scale,
+            weekday / 6,
+            _day_of_month(days) / 30,
+            positions / max(1, total_count),
+        ]
+    )
+
+
+def _fit_ridge(features: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    n_features = features.shape[1]
+    xtx = features.T @ features + RIDGE_L2 * np.eye(n_features)
+    try:
+        return np.linalg.solve(xtx, features.T @ targets)
+    except np.linalg.LinAlgError:
+        weights = np.zeros(n_features)
+        weights[0] = targets.mean()
+        return weights
+
+
+def _fit_stump(features: np.ndarray, residuals: np.ndarray, base_error: float) -> Stump | None:
+    n_rows = len(residuals)
+    best: Stump | None = None
+    best_gain = -np.inf
+
+    for feature_index in range(features.shape[1]):
+        order = np.argsort(features[:, feature_index], kind="stable")
+        values = features[order, feature_index]
+        cumulative = np.cumsum(residuals[order])
+
+        # Each distinct value is a threshold; rows <= threshold go left
+        run_end = np.append(values[1:] != values[:-1], True)
+        left_count = np.arange(1, n_rows + 1)[run_end]
+        left_sum = cumulative[run_end]
+        right_count = n_rows - left_count
+        right_sum = cumulative[-1] - left_sum
+
+        # Squared error drops by n * mean^2 on each side
+        gains = left_sum**2 / left_count + np.divide(
+            right_sum**2,
+            right_count,
+            out=np.zeros_like(right_sum),
+            where=right_count > 0,
+        )
+        candidate = int(np.argmax(gains))
+        if gains[candidate] > best_gain:
+            best_gain = gains[candidate]
+            right = right_count[candidate]
+            best = Stump(
+                feature_index=feature_index,
+                threshold=float(values[run_end][candidate]),
+                left_value=float(left_sum[candidate] / left_count[candidate]),
+                right_value=float(right_sum[candidate] / right) if right else 0.0,
+            )
+
+    if best is None or best_gain <= base_error * 0.01:
+        return None
+    return best
+
+
+def _fit_boosting(
+    features: np.ndarray, targets: np.ndarray, predictions: np.ndarray
+) -> list[Stump]:
+    stumps: list[Stump] = []
+    for _ in range(MAX_STUMPS):
+        residuals = targets - predictions
+        base_error = float(residuals @ residuals)
+        if not base_error:
+            break
+        stump = _fit_stump(features, residuals, base_error)
+        if stump is None:
+            break
+        stumps.append(stump)
+        predictions = predictions + BOOSTING_LEARNING_RATE * stump.predict(features)
+    return stumps
+
+
+@dataclass
+class ExpenseModel:
+    days: np.ndarray
+    expenses: np.ndarray
+    horizon: int
+    avg_expense: float = 0.0
+    baselines: np.ndarray = field(default_factory=lambda: np.zeros(7))
+    weights: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    stumps: list[Stump] = field(default_factory=list)
+
+    @property
+    def total_count(self) -> int:
+        return len(self.expenses) + self.horizon
+
+    def forecast(self) -> list[tuple[date, float]]:
+        if not len(self.expenses):
+            return []
+
+        synthetic = list(self.expenses)
+        latest = self.days[-1]
+        points = []
+        for step in range(1, self.horizon + 1):
+            day = latest + np.timedelta64(step, "D")
+            features = _feature_rows(
+                np.asarray(synthetic),
+                np.array([len(synthetic)]),
+                np.array([day]),
+                avg_expense=self.avg_expense,
+                baselines=self.baselines,
+                total_count=self.total_count,
+            )[0]
+            prediction = float(features @ self.weights)
+            for stump in self.stumps:
+                prediction += BOOSTING_LEARNING_RATE * float(stump.predict(features))
+
+            blended = max(0.0, 0.6 * prediction + 0.25 * synthetic[-1] + 0.15 * self.avg_expense)
+            synthetic.append(blended)
+            points.append((day.astype(date), float(np.floor(blended + 0.5))))
+        return points
+
+
+def fit_expense_model(days: list[date], expenses: list[float], horizon: int) -> ExpenseModel:
+    """Fit the feature model on a daily expense series sorted by day."""
+    day_array = np.array(days, dtype="datetime64[D]")
+    expense_array = np.asarray(expenses, dtype=np.float64)
+    model = ExpenseModel(days=day_array, expenses=expense_array, horizon=horizon)
+    if not len(expense_array):
+        return model
+
+    model.avg_expense = float(expense_array.mean())
+    weekday = _weekday(day_array)
+    totals = np.bincount(weekday, weights=expense_array, minlength=7)
+    counts = np.bincount(weekday, minlength=7)
+    model.baselines = np.divide(totals, counts, out=np.full(7, model.avg_expense), where=counts > 0)
+
+    features = _feature_rows(
+        expense_array,
+        np.arange(len(expense_array)),
+        day_array,
+        avg_expense=model.avg_expense,
+        baselines=model.baselines,
+        total_count=model.total_count,
+    )
+    model.weights = _fit_ridge(features, expense_array)
+    model.stumps = _fit_boosting(features, expense_array, features @ model.weights)
+    return model
+
+
+class ForecastCache:
+    """Last fitted model per user, kept while its key (data version and parameters) matches."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, tuple[Any, ExpenseModel]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int, key: Any) -> ExpenseModel | None:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] != key:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, user_id: int, key: Any, model: ExpenseModel) -> None:
+        self._entries[user_id] = (key, model)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+forecast_cache = ForecastCache(settings.forecast_cache_max_entries)
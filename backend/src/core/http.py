@@ -0,0 +1,48 @@
+import asyncio
+
+import httpx
+
+from src.core.config import settings
+
+
+class HostLimitedTransport(httpx.AsyncBaseTransport):
+    """Wraps a transport and caps concurrent requests per upstream host."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_per_host: int):
+        self._transport = transport
+        self._max_per_host = max_per_host
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def _semaphore(self, host: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self._max_per_host)
+            self._semaphores[host] = semaphore
+        return semaphore
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        async with self._semaphore(request.url.host):
+            response = await self._transport.handle_async_request(request)
+            # Buffer the body so the slot is released together with the connection
+            await response.aread()
+            return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def create_http_client(transport: httpx.AsyncBaseTransport | None = None) -> httpx.AsyncClient:
+    if transport is None:
+        transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                keepalive_expiry=settings.http_keepalive_expiry_seconds,
+            ),
+            retries=1,
+        )
+
+    return httpx.AsyncClient(
+        transport=HostLimitedTransport(transport, settings.http_max_connections_per_host),
+        timeout=settings.http_timeout_seconds,
+    )
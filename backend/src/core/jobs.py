@@ -0,0 +1,360 @@
+"""In-process background jobs for work too long for a request: imports, exports and
+account purges.
+
+Jobs are rows in ``jobs``. Every API process runs a ``JobRunner`` that claims queued jobs,
+at most ``jobs_concurrency`` at a time; processes share the table, and PostgreSQL claims
+skip rows locked by another process.
+
+A running job's heartbeat is refreshed every HEARTBEAT_SECONDS. On shutdown, running jobs
+are queued again; jobs of a process that died are queued again once their heartbeat is
+STALE_AFTER_SECONDS old, up to ``jobs_max_attempts`` attempts. Handlers therefore start
+over or continue: imports run in one DB transaction, exports rewrite their file and
+purges delete what is left.
+
+Uploaded inputs and results are files in ``jobs_dir``, removed ``jobs_artifact_ttl_hours``
+after the job finished.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+from datetime import UTC, datetime, timedelta
+from functools import partial
+import logging
+from pathlib import Path
+import time
+
+from fastapi import UploadFile
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from src.core.accounts import purge_user_data
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal
+from src.core.user_data import ImportFormatError, export_document, import_document
+from src.models.category import Category
+from src.models.job import JOB_FAILED, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, Job
+from src.models.transaction import Transaction
+from src.models.user import User
+
+logger = logging.getLogger(__name__)
+
+JOB_EXPORT = "export"
+JOB_IMPORT = "import"
+JOB_PURGE = "purge"
+
+POLL_INTERVAL_SECONDS = 5
+HEARTBEAT_SECONDS = 30
+STALE_AFTER_SECONDS = 5 * HEARTBEAT_SECONDS
+PROGRESS_INTERVAL_SECONDS = 1
+CLEANUP_INTERVAL_SECONDS = 3600
+
+_UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+class JobError(Exception):
+    """A failure whose message is stored on the job as is."""
+
+
+def job_path(name: str) -> Path:
+    return settings.jobs_dir / name
+
+
+async def save_upload(file: UploadFile, name: str) -> None:
+    """Copy an uploaded file to ``jobs_dir`` chunk by chunk."""
+    settings.jobs_dir.mkdir(parents=True, exist_ok=True)
+    with job_path(name).open("wb") as target:
+        while chunk := await file.read(_UPLOAD_CHUNK_BYTES):
+            await asyncio.to_thread(target.write, chunk)
+
+
+async def enqueue_job(
+    db: AsyncSession, *, user_id: int, kind: str, input_file: str | None = None
+) -> Job:
+    job = Job(user_id=user_id, kind=kind, status=JOB_QUEUED, input_file=input_file)
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+def _remove_files(*names: str | None) -> None:
+    for name in names:
+        if name:
+            job_path(name).unlink(missing_ok=True)
+
+
+async def delete_user_jobs(db: AsyncSession, user_id: int) -> None:
+    """Delete a user's jobs and their files; the caller commits."""
+    result = await db.execute(
+        delete(Job).where(Job.user_id == user_id).returning(Job.input_file, Job.artifact_file)
+    )
+    for input_file, artifact_file in result.all():
+        _remove_files(input_file, artifact_file)
+
+
+class JobProgress:
+    """Progress callback of a running job, written at most every PROGRESS_INTERVAL_SECONDS."""
+
+    def __init__(self, session_factory: sessionmaker, job_id: int):
+        self.session_factory = session_factory
+        self.job_id = job_id
+        self.progress = 0
+        self._written_at = 0.0
+
+    async def __call__(self, progress: int) -> None:
+        self.progress = progress
+        if time.monotonic() - self._written_at >= PROGRESS_INTERVAL_SECONDS:
+            await self.update(progress=progress)
+
+    async def update(self, **values) -> None:
+        self._written_at = time.monotonic()
+        async with self.session_factory() as db:
+            await db.execute(
+                update(Job)
+                .where(Job.id == self.job_id)
+                .values(**values, heartbeat_at=datetime.now(UTC))
+            )
+            await db.commit()
+
+
+class JobRunner:
+    def __init__(self, session_factory: sessionmaker = AsyncSessionLocal):
+        self.session_factory = session_factory
+        self._handlers: dict[str, Callable[[Job, JobProgress], Awaitable[dict]]] = {
+            JOB_EXPORT: self._export,
+            JOB_IMPORT: self._import,
+            JOB_PURGE: self._purge,
+        }
+        self._tasks: dict[int, asyncio.Task] = {}
+        self._wakeup = asyncio.Event()
+
+    def notify(self) -> None:
+        """Look for queued jobs now instead of at the next poll."""
+        self._wakeup.set()
+
+    async def run(self) -> None:
+        heartbeat_at = cleanup_at = 0.0
+        try:
+            while True:
+                self._wakeup.clear()
+                try:
+                    if time.monotonic() - heartbeat_at >= HEARTBEAT_SECONDS:
+                        heartbeat_at = time.monotonic()
+                        await self._heartbeat()
+                        await self._requeue_stale()
+                    if time.monotonic() - cleanup_at >= CLEANUP_INTERVAL_SECONDS:
+                        cleanup_at = time.monotonic()
+                        await self._remove_expired_files()
+                    await self._start_queued()
+                except SQLAlchemyError as err:
+                    logger.warning(f"Job runner failed: {err}")
+
+                with suppress(TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), POLL_INTERVAL_SECONDS)
+        finally:
+            await self._stop()
+
+    async def _start_queued(self) -> None:
+        while len(self._tasks) < settings.jobs_concurrency:
+            job = await self._claim()
+            if job is None:
+                return
+            task = asyncio.create_task(self._execute(job))
+            self._tasks[job.id] = task
+            task.add_done_callback(partial(self._done, job.id))
+
+    def _done(self, job_id: int, _task: asyncio.Task) -> None:
+        self._tasks.pop(job_id, None)
+        self._wakeup.set()
+
+    async def _claim(self) -> Job | None:
+        now = datetime.now(UTC)
+        oldest = (
+            select(Job.id)
+            .where(Job.status == JOB_QUEUED)
+            .order_by(Job.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(Job)
+                .where(Job.id == oldest, Job.status == JOB_QUEUED)
+                .values(
+                    status=JOB_RUNNING,
+                    attempts=Job.attempts + 1,
+                    started_at=now,
+                    heartbeat_at=now,
+                )
+                .returning(Job)
+            )
+            job = result.scalar_one_or_none()
+            await db.commit()
+            return job
+
+    async def _execute(self, job: Job) -> None:
+        progress = JobProgress(self.session_factory, job.id)
+        try:
+            values = await self._handlers[job.kind](job, progress)
+        except JobError as err:
+            await self._finish(job, JOB_FAILED, error=str(err))
+        except Exception as err:
+            logger.exception(f"Job {job.id} ({job.kind}) failed")
+            await self._finish(job, JOB_FAILED, error=str(err))
+        else:
+            await self._finish(job, JOB_SUCCEEDED, progress=progress.progress, **values)
+
+    async def _finish(self, job: Job, status: str, **values) -> None:
+        now = datetime.now(UTC)
+        try:
+            async with self.session_factory() as db:
+                await db.execute(
+                    update(Job)
+                    .where(Job.id == job.id, Job.status == JOB_RUNNING)
+                    .values(
+                        status=status,
+                        input_file=None,
+                        finished_at=now,
+                        heartbeat_at=now,
+                        **values,
+                    )
+                )
+                await db.commit()
+        except SQLAlchemyError as err:
+            # The heartbeat goes stale and the job runs again
+            logger.warning(f"Could not finish job {job.id}: {err}")
+            return
+        _remove_files(job.input_file)
+
+    async def _heartbeat(self) -> None:
+        if not self._tasks:
+            return
+        async with self.session_factory() as db:
+            await db.execute(
+                update(Job)
+                .where(Job.id.in_(list(self._tasks)), Job.status == JOB_RUNNING)
+                .values(heartbeat_at=datetime.now(UTC))
+            )
+            await db.commit()
+
+    async def _requeue_stale(self) -> None:
+        now = datetime.now(UTC)
+        stale = and_(
+            Job.status == JOB_RUNNING,
+            Job.id.not_in(list(self._tasks)),
+            Job.heartbeat_at < now - timedelta(seconds=STALE_AFTER_SECONDS),
+        )
+        async with self.session_factory() as db:
+            await db.execute(
+                update(Job)
+                .where(stale, Job.attempts >= settings.jobs_max_attempts)
+                .values(status=JOB_FAILED, error="Interrupted too many times", finished_at=now)
+            )
+            result = await db.execute(update(Job).where(stale).values(status=JOB_QUEUED))
+            await db.commit()
+        if result.rowcount:
+            logger.info(f"Queued {result.rowcount} interrupted jobs again")
+
+    async def _remove_expired_files(self) -> None:
+        cutoff = datetime.now(UTC) - timedelta(hours=settings.jobs_artifact_ttl_hours)
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(Job.id, Job.input_file, Job.artifact_file).where(
+                    Job.finished_at < cutoff,
+                    or_(Job.input_file.is_not(None), Job.artifact_file.is_not(None)),
+                )
+            )
+            expired = result.all()
+            if not expired:
+                return
+            await db.execute(
+                update(Job)
+                .where(Job.id.in_([job_id for job_id, _, _ in expired]))
+                .values(input_file=None, artifact_file=None)
+            )
+            await db.commit()
+
+        for _, input_file, artifact_file in expired:
+            _remove_files(input_file, artifact_file)
+
+    async def _stop(self) -> None:
+        """Cancel running jobs and queue them again, without counting the attempt."""
+        job_ids = list(self._tasks)
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        if not job_ids:
+            return
+
+        try:
+            async with self.session_factory() as db:
+                await db.execute(
+                    update(Job)
+                    .where(Job.id.in_(job_ids), Job.status == JOB_RUNNING)
+                    .values(status=JOB_QUEUED, attempts=Job.attempts - 1)
+                )
+                await db.commit()
+        except SQLAlchemyError as err:
+            logger.warning(f"Could not requeue jobs {job_ids}: {err}")
+
+    async def _export(self, job: Job, progress: JobProgress) -> dict:
+        async with self.session_factory() as db:
+            user = await db.get(User, job.user_id)
+            if user is None:
+                raise JobError("User not found")
+            categories = await db.scalar(
+                select(func.count()).where(
+                    Category.user_id == user.id, Category.deleted_at.is_(None)
+                )
+            )
+            transactions = await db.scalar(
+                select(func.count()).where(
+                    Transaction.user_id == user.id, Transaction.deleted_at.is_(None)
+                )
+            )
+        await progress.update(total=categories + transactions)
+
+        name = f"export-{job.id}.json"
+        partial_path = job_path(f"{name}.partial")
+        settings.jobs_dir.mkdir(parents=True, exist_ok=True)
+        with partial_path.open("w", encoding="utf-8") as target:
+            async for chunk in export_document(user, self.session_factory, progress):
+                await asyncio.to_thread(target.write, chunk)
+        partial_path.replace(job_path(name))
+        return {"artifact_file": name}
+
+    async def _import(self, job: Job, progress: JobProgress) -> dict:
+        async with self.session_factory() as db:
+            user = await db.get(User, job.user_id)
+            if user is None:
+                raise JobError("User not found")
+
+            with job_path(job.input_file).open("rb") as source:
+
+                async def read(size: int) -> bytes:
+                    return await asyncio.to_thread(source.read, size)
+
+                # SQLite has a single writer: progress writes would wait for this transaction
+                on_progress = None if db.get_bind().dialect.name == "sqlite" else progress
+                try:
+                    summary = await import_document(db, user, read, on_progress)
+                    await db.commit()
+                except ImportFormatError as err:
+                    raise JobError(str(err)) from err
+                except Exception as err:
+                    raise JobError(f"Error importing data: {err}") from err
+
+        return {"result": summary}
+
+    async def _purge(self, job: Job, progress: JobProgress) -> dict:
+        """Delete the account of an inactive user, this job's row included."""
+        async with self.session_factory() as db:
+            await purge_user_data(db, job.user_id, progress)
+            await delete_user_jobs(db, job.user_id)
+            await db.execute(delete(User).where(User.id == job.user_id))
+            await db.commit()
+        return {}
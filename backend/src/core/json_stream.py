@@ -0,0 +1,113 @@
+"""Incremental parsing of a JSON object whose members are mostly large arrays.
+
+Only the text of the value being decoded is buffered, so memory is bounded by the largest
+single array element (``max_item_bytes``) rather than by the document.
+"""
+
+import codecs
+from collections.abc import AsyncIterator, Awaitable, Callable
+import json
+import re
+from typing import Any
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+
+class JsonStreamError(ValueError):
+    pass
+
+
+class _Buffer:
+    def __init__(self, read: Callable[[int], Awaitable[bytes]], chunk_size: int, max_item: int):
+        self._read = read
+        self._chunk_size = chunk_size
+        self._max_item = max_item
+        self._decode = codecs.getincrementaldecoder("utf-8")().decode
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    async def fill(self) -> None:
+        if self.eof:
+            raise JsonStreamError("Unexpected end of JSON document")
+        if len(self.text) - self.pos > self._max_item:
+            raise JsonStreamError(f"JSON value larger than {self._max_item} bytes")
+        chunk = await self._read(self._chunk_size)
+        self.eof = not chunk
+        self.text = self.text[self.pos :] + self._decode(chunk, final=self.eof)
+        self.pos = 0
+
+    async def peek(self) -> str:
+        """Next non-whitespace character, or "" at the end of the document."""
+        while True:
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text) or self.eof:
+                return self.text[self.pos : self.pos + 1]
+            await self.fill()
+
+    async def expect(self, char: str) -> None:
+        if await self.peek() != char:
+            raise JsonStreamError(f"Expected {char!r} at position {self.pos}")
+        self.pos += 1
+
+    async def value(self) -> Any:
+        await self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            else:
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(self.text) or self.eof:
+                    self.pos = end
+                    return value
+            await self.fill()
+
+
+async def iter_members(
+    read: Callable[[int], Awaitable[bytes]],
+    *,
+    chunk_size: int = 64 * 1024,
+    max_item_bytes: int = 1024 * 1024,
+) -> AsyncIterator[tuple[str, Any, bool]]:
+    """Walk a top-level JSON object read with ``read(size)``.
+
+    Yields ``(key, value, False)`` for members that are not arrays and
+    ``(key, element, True)`` for each element of array members, in document order.
+    """
+    buffer = _Buffer(read, chunk_size, max_item_bytes)
+    await buffer.expect("{")
+    if await buffer.peek() == "}":
+        buffer.pos += 1
+        return
+
+    while True:
+        key = await buffer.value()
+        if not isinstance(key, str):
+            raise JsonStreamError(f"Expected an object key at position {buffer.pos}")
+        await buffer.expect(":")
+
+        if await buffer.peek() == "[":
+            buffer.pos += 1
+            if await buffer.peek() == "]":
+                buffer.pos += 1
+            else:
+                while True:
+                    yield key, await buffer.value(), True
+                    if await buffer.peek() == "]":
+                        buffer.pos += 1
+                        break
+                    await buffer.expect(",")
+        else:
+            yield key, await buffer.value(), False
+
+        if await buffer.peek() == "}":
+            buffer.pos += 1
+            break
+        await buffer.expect(",")
+
+    if await buffer.peek():
+        raise JsonStreamError(f"Extra data at position {buffer.pos}")
@@ -0,0 +1,42 @@
+import base64
+import binascii
+import json
+
+from fastapi import HTTPException, Query, status
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Larger ``limit`` values are clamped rather than rejected, so clients that used to ask
+# for more rows in one page keep working and follow X-Next-Cursor for the rest
+MAX_PAGE_SIZE = 1000
+
+
+def page_limit(
+    limit: int = Query(
+        100, ge=1, description=f"Page size; larger values are clamped to {MAX_PAGE_SIZE}"
+    ),
+) -> int:
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError) as err:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        ) from err
+
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+    return values
@@ -0,0 +1,318 @@
+"""Monthly range partitions of ``transactions`` by ``transaction_date`` (PostgreSQL only).
+
+Enabled with ``TRANSACTIONS_PARTITIONED=true``. A new database gets a partitioned table at
+startup; an existing one is converted with ``python -m src.core.partitions migrate``, which
+copies the table under an exclusive lock, so run it in a maintenance window.
+
+Partitions are named ``transactions_pYYYY_MM`` and hold one UTC month each; rows outside them
+land in ``transactions_default``. Startup and a daily task create partitions
+``transactions_partition_months_ahead`` months ahead and move months that collected rows in
+the default partition out into their own partition.
+
+Queries filtering on ``transaction_date`` only scan the matching partitions. Old months are
+removed with ``python -m src.core.partitions detach --before YYYY-MM [--archive-schema NAME]``:
+detaching is a catalog change (no DELETE), and the detached tables stay in place, or move to
+the archive schema, until dropped. Their rows are subtracted from the rollups, and their
+users' data_version is bumped with a forced full resync, since the rows vanish without
+tombstones.
+"""
+
+import argparse
+import asyncio
+from datetime import UTC, date, datetime
+import logging
+import re
+
+from sqlalchemy import MetaData, PrimaryKeyConstraint, column, select, table, text, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.schema import CreateTable
+
+from src.core.config import settings
+from src.core.database import Base, engine, sync_schema
+from src.core.rollups import subtract_rollups
+from src.models.category import Category
+from src.models.transaction import Transaction
+from src.models.user import User
+
+logger = logging.getLogger(__name__)
+
+TABLE = Transaction.__tablename__
+DEFAULT_PARTITION = f"{TABLE}_default"
+MAINTENANCE_INTERVAL_SECONDS = 86400
+
+_PARTITION_NAME = re.compile(rf"^{TABLE}_p(\d{{4}})_(\d{{2}})$")
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{TABLE}_p{month:%Y_%m}"
+
+
+def _bounds(month: date) -> str:
+    # Explicit UTC offsets: bare dates would be read in the session time zone
+    return (
+        f"FROM ('{month.isoformat()} 00:00:00+00') "
+        f"TO ('{_add_months(month, 1).isoformat()} 00:00:00+00')"
+    )
+
+
+async def _relkind(conn: AsyncConnection, name: str) -> str | None:
+    """``p`` for a partitioned table, ``r`` for a plain one, None when missing."""
+    result = await conn.execute(
+        text("SELECT relkind::text FROM pg_class WHERE oid = to_regclass(:name)"), {"name": name}
+    )
+    return result.scalar()
+
+
+async def _partition_months(conn: AsyncConnection) -> list[date]:
+    result = await conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:name)"
+        ),
+        {"name": TABLE},
+    )
+    months = []
+    for (name,) in result:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            months.append(date(int(match[1]), int(match[2]), 1))
+    return sorted(months)
+
+
+def _upcoming_months() -> set[date]:
+    current = datetime.now(UTC).date().replace(day=1)
+    return {
+        _add_months(current, offset)
+        for offset in range(settings.transactions_partition_months_ahead + 1)
+    }
+
+
+async def _months_with_rows(conn: AsyncConnection, name: str) -> set[date]:
+    result = await conn.execute(
+        text(
+            "SELECT DISTINCT date_trunc('month', "
+            "coalesce(transaction_date, created_at, now()) AT TIME ZONE 'UTC')::date "
+            f"FROM {name}"
+        )
+    )
+    return set(result.scalars())
+
+
+def _create_parent(sync_conn, name: str) -> None:
+    """CREATE TABLE ``name`` shaped like transactions, partitioned by month, without indexes."""
+    metadata = MetaData()
+    # Copies of the referenced tables let the foreign keys resolve
+    User.__table__.to_metadata(metadata)
+    Category.__table__.to_metadata(metadata)
+    parent = Transaction.__table__.to_metadata(metadata, name=name)
+    parent.dialect_options["postgresql"]["partition_by"] = "RANGE (transaction_date)"
+    # The partition key must be part of the primary key and cannot be NULL
+    parent.c.transaction_date.nullable = False
+    parent.c.transaction_date.primary_key = True
+    parent.c.id.autoincrement = True
+    parent.append_constraint(PrimaryKeyConstraint(parent.c.id, parent.c.transaction_date))
+    sync_conn.execute(CreateTable(parent))
+    sync_conn.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {name} DEFAULT"))
+
+
+async def _create_partitioned_table(conn: AsyncConnection) -> None:
+    await conn.run_sync(Base.metadata.create_all, tables=[User.__table__, Category.__table__])
+    await conn.run_sync(_create_parent, TABLE)
+
+
+async def _add_partition(conn: AsyncConnection, month: date) -> None:
+    """Create and attach the partition for ``month``, moving its rows out of the default one.
+
+    Attaching scans the default partition for rows in the new range, so it is kept small.
+    """
+    name = partition_name(month)
+    await conn.execute(text(f"CREATE TABLE {name} (LIKE {TABLE} INCLUDING DEFAULTS)"))
+    await conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            "WHERE transaction_date >= :start AND transaction_date < :end RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        {
+            "start": datetime.combine(month, datetime.min.time(), UTC),
+            "end": datetime.combine(_add_months(month, 1), datetime.min.time(), UTC),
+        },
+    )
+    await conn.execute(
+        text(f"ALTER TABLE {TABLE} ATTACH PARTITION {name} FOR VALUES {_bounds(month)}")
+    )
+
+
+async def ensure_partitions(conn: AsyncConnection) -> list[str]:
+    """Create the partitions for the coming months and for months in the default partition."""
+    wanted = _upcoming_months() | await _months_with_rows(conn, DEFAULT_PARTITION)
+
+    created = []
+    for month in sorted(wanted - set(await _partition_months(conn))):
+        await _add_partition(conn, month)
+        created.append(partition_name(month))
+    return created
+
+
+async def sync_partitions(conn: AsyncConnection) -> None:
+    """Startup hook, run before ``sync_schema``: create the partitioned table or its partitions."""
+    if conn.dialect.name != "postgresql":
+        return
+
+    relkind = await _relkind(conn, TABLE)
+    if relkind is None and settings.transactions_partitioned:
+        await _create_partitioned_table(conn)
+        relkind = "p"
+    elif relkind == "r" and settings.transactions_partitioned:
+        logger.warning(
+            f"{TABLE} is not partitioned yet, run: python -m src.core.partitions migrate"
+        )
+
+    if relkind == "p":
+        created = await ensure_partitions(conn)
+        if created:
+            logger.info(f"Created partitions: {', '.join(created)}")
+
+
+async def run_partition_maintenance() -> None:
+    while True:
+        await asyncio.sleep(MAINTENANCE_INTERVAL_SECONDS)
+        try:
+            async with engine.begin() as conn:
+                await sync_partitions(conn)
+        except SQLAlchemyError as err:
+            logger.warning(f"Partition maintenance failed: {err}")
+
+
+async def migrate(conn: AsyncConnection) -> bool:
+    """Convert a plain transactions table into a partitioned one; False if already done."""
+    if await _relkind(conn, TABLE) != "r":
+        return False
+
+    staging = f"{TABLE}_partitioned"
+    await conn.execute(text(f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE"))
+    await conn.run_sync(_create_parent, staging)
+
+    # Months without rows are left to the default partition until they get some
+    for month in sorted(_upcoming_months() | await _months_with_rows(conn, TABLE)):
+        await conn.execute(
+            text(
+                f"CREATE TABLE {partition_name(month)} PARTITION OF {staging} "
+                f"FOR VALUES {_bounds(month)}"
+            )
+        )
+
+    columns = list(Transaction.__table__.columns.keys())
+    selected = [
+        "coalesce(transaction_date, created_at, now())" if name == "transaction_date" else name
+        for name in columns
+    ]
+    await conn.execute(
+        text(
+            f"INSERT INTO {staging} ({', '.join(columns)}) "
+            f"SELECT {', '.join(selected)} FROM {TABLE}"
+        )
+    )
+
+    await conn.execute(text(f"DROP TABLE {TABLE}"))
+    await conn.execute(text(f"ALTER TABLE {staging} RENAME TO {TABLE}"))
+    constraints = await conn.execute(
+        text("SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(:name)"),
+        {"name": TABLE},
+    )
+    for (name,) in constraints.all():
+        if name.startswith(staging):
+            renamed = TABLE + name.removeprefix(staging)
+            await conn.execute(
+                text(f'ALTER TABLE {TABLE} RENAME CONSTRAINT "{name}" TO "{renamed}"')
+            )
+    await conn.execute(text(f"ALTER SEQUENCE {staging}_id_seq RENAME TO {TABLE}_id_seq"))
+    await conn.execute(
+        text(
+            f"SELECT setval('{TABLE}_id_seq', "
+            f"coalesce((SELECT max(id) FROM {TABLE}), 0) + 1, false)"
+        )
+    )
+
+    # Indexes are built once, after the copy
+    await sync_schema(conn)
+    return True
+
+
+async def _force_resync(conn: AsyncConnection, source) -> None:
+    """Bump data_version of the users with rows in ``source`` and reset their delta sync.
+
+    Detached rows leave no tombstones, so clients must start over as after a tombstone purge.
+    """
+    users = User.__table__
+    await conn.execute(
+        update(users)
+        .where(users.c.id.in_(select(source.c.user_id).distinct()))
+        # Keep updated_at: it describes the profile, not the user's data
+        .values(
+            data_version=users.c.data_version + 1,
+            tombstones_purged_seq=users.c.data_version + 1,
+            updated_at=users.c.updated_at,
+        )
+    )
+
+
+async def detach_before(
+    conn: AsyncConnection, before: date, archive_schema: str | None = None
+) -> list[str]:
+    """Detach the monthly partitions that end on or before ``before``."""
+    detached = []
+    for month in await _partition_months(conn):
+        if _add_months(month, 1) > before:
+            break
+        name = partition_name(month)
+        source = table(name, *map(column, Transaction.__table__.columns.keys()))
+        await _force_resync(conn, source)
+        await subtract_rollups(conn, source)
+        await conn.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {name}"))
+        if archive_schema:
+            await conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{archive_schema}"'))
+            await conn.execute(text(f'ALTER TABLE {name} SET SCHEMA "{archive_schema}"'))
+        detached.append(name)
+    return detached
+
+
+def _month(value: str) -> date:
+    try:
+        return date.fromisoformat(f"{value}-01")
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM, got {value!r}") from err
+
+
+async def _main() -> None:
+    parser = argparse.ArgumentParser(description="Monthly partitions of the transactions table")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("migrate", help="convert the existing table into a partitioned one")
+    commands.add_parser("ensure", help="create upcoming partitions")
+    detach = commands.add_parser("detach", help="detach partitions of months before --before")
+    detach.add_argument("--before", type=_month, required=True, metavar="YYYY-MM")
+    detach.add_argument("--archive-schema", default=None)
+    args = parser.parse_args()
+
+    async with engine.begin() as conn:
+        if args.command == "migrate":
+            migrated = await migrate(conn)
+            print(f"{TABLE} migrated" if migrated else f"{TABLE} is already partitioned")
+        elif await _relkind(conn, TABLE) != "p":
+            print(f"{TABLE} is not partitioned, run migrate first")
+        elif args.command == "ensure":
+            print("\n".join(await ensure_partitions(conn)) or "Nothing to create")
+        else:
+            detached = await detach_before(conn, args.before, args.archive_schema)
+            print("\n".join(detached) or "Nothing to detach")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
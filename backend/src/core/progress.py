@@ -0,0 +1,6 @@
+"""Progress reporting of long operations, such as imports, exports and account purges."""
+
+from collections.abc import Awaitable, Callable
+
+# Called with the number of rows processed so far
+ProgressCallback = Callable[[int], Awaitable[None]]
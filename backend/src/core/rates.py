@@ -0,0 +1,384 @@
+import asyncio
+from collections.abc import Iterable, Sequence
+from datetime import UTC, date as date_type, datetime, timedelta
+import logging
+
+from fastapi import HTTPException, status
+import httpx
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal
+from src.core.rates_cache import RatesCache
+from src.core.resilience import CircuitBreaker, CircuitOpenError, HedgeStats, hedged
+from src.models.exchange_rate import ExchangeRate
+
+logger = logging.getLogger(__name__)
+
+BASE_CURRENCY = "RUB"
+SUPPORTED_CURRENCIES = ("RUB", "USD", "EUR", "AED")
+CURRENCY_INDEX = {code: index for index, code in enumerate(SUPPORTED_CURRENCIES)}
+HTTP_OK = 200
+HTTP_NOT_FOUND = 404
+# Longest stretch without a CBR publication (New Year holidays)
+MAX_FILL_LOOKBACK_DAYS = 14
+
+rates_cache = RatesCache(
+    max_entries=settings.currency_cache_max_entries,
+    stale_ttl=settings.currency_cache_stale_seconds,
+)
+cbr_breaker = CircuitBreaker(
+    "cbr",
+    failure_threshold=settings.currency_breaker_failure_threshold,
+    reset_timeout=settings.currency_breaker_reset_seconds,
+)
+fallback_breaker = CircuitBreaker(
+    "fallback",
+    failure_threshold=settings.currency_breaker_failure_threshold,
+    reset_timeout=settings.currency_breaker_reset_seconds,
+)
+hedge_stats = HedgeStats()
+
+
+def build_rates_payload(data: dict) -> dict:
+    if "Valute" in data:
+        valute = data.get("Valute", {})
+        rates = {}
+        for code in ("USD", "EUR", "AED"):
+            info = valute.get(code)
+            if not info:
+                rates[code] = 0
+                continue
+            nominal = info.get("Nominal") or 1
+            value = info.get("Value") or 0
+            rates[code] = nominal / value if value else 0
+
+        raw_date = data.get("Date")
+        date = raw_date
+        if raw_date:
+            try:
+                date = datetime.fromisoformat(raw_date).date().isoformat()
+            except ValueError:
+                date = datetime.now(UTC).date().isoformat()
+        else:
+            date = datetime.now(UTC).date().isoformat()
+
+        base = BASE_CURRENCY
+    else:
+        rates = data.get("rates", {})
+        base = data.get("base") or data.get("base_code") or BASE_CURRENCY
+        date = data.get("date") or datetime.now(UTC).date().isoformat()
+
+    return {
+        "base": base,
+        "date": date,
+        "rates": {
+            "RUB": 1.0,
+            "USD": rates.get("USD", 0),
+            "EUR": rates.get("EUR", 0),
+            "AED": rates.get("AED", 0),
+        },
+    }
+
+
+def _unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Currency service unavailable",
+    )
+
+
+class RatesFetcher:
+    """Talks to the upstream rate providers.
+
+    Base URLs default to the public services and can point at a local fixture server.
+    Each provider sits behind a circuit breaker; with ``hedge_delay`` set, the fallback is
+    raced against a CBR request that has not answered in time.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        cbr_url: str | None = None,
+        fallback_url: str | None = None,
+        hedge_delay: float | None = None,
+    ):
+        self.client = client
+        self.cbr_url = cbr_url or settings.cbr_api_url
+        self.fallback_url = fallback_url or settings.fallback_rates_api_url
+        self.hedge_delay = (
+            hedge_delay if hedge_delay is not None else settings.currency_hedge_delay_seconds
+        )
+
+    def _cbr_url(self, day: str | None) -> str:
+        if not day:
+            return f"{self.cbr_url}/daily_json.js"
+        return f"{self.cbr_url}/archive/{day.replace('-', '/')}/daily_json.js"
+
+    async def _get(self, breaker: CircuitBreaker, url: str) -> httpx.Response:
+        async def request() -> httpx.Response:
+            response = await self.client.get(url)
+            # Only server-side errors count against the provider; 404 is a valid answer
+            if response.is_server_error:
+                response.raise_for_status()
+            return response
+
+        return await breaker.call(request)
+
+    async def fetch_published(self, day: str | None) -> dict:
+        """CBR rates published for ``day``; an empty dict when CBR has no publication that day."""
+        try:
+            response = await self._get(cbr_breaker, self._cbr_url(day))
+        except (CircuitOpenError, httpx.HTTPStatusError) as err:
+            raise _unavailable() from err
+
+        if response.status_code == HTTP_OK:
+            return build_rates_payload(response.json())
+        if response.status_code == HTTP_NOT_FOUND:
+            return {}
+        raise _unavailable()
+
+    async def _fetch_cbr(self, day: str | None) -> dict:
+        response = await self._get(cbr_breaker, self._cbr_url(day))
+        if response.status_code != HTTP_OK:
+            raise _unavailable()
+        return build_rates_payload(response.json())
+
+    async def _fetch_fallback(self) -> dict:
+        response = await self._get(fallback_breaker, f"{self.fallback_url}/{BASE_CURRENCY}")
+        if response.status_code != HTTP_OK:
+            raise _unavailable()
+        return build_rates_payload(response.json())
+
+    async def fetch(self, day: str | None) -> dict:
+        try:
+            if self.hedge_delay is not None:
+                return await hedged(
+                    lambda: self._fetch_cbr(day),
+                    self._fetch_fallback,
+                    self.hedge_delay,
+                    hedge_stats,
+                )
+            try:
+                return await self._fetch_cbr(day)
+            except (HTTPException, CircuitOpenError, httpx.HTTPError):
+                return await self._fetch_fallback()
+        except httpx.TimeoutException:
+            raise
+        except (CircuitOpenError, httpx.HTTPError) as err:
+            raise _unavailable() from err
+
+
+async def read_stored_rates(db: AsyncSession, day: str) -> dict | None:
+    result = await db.execute(
+        select(ExchangeRate).filter(ExchangeRate.rate_date == date_type.fromisoformat(day))
+    )
+    rows = result.scalars().all()
+    if not rows:
+        return None
+
+    rates = {code: 0 for code in SUPPORTED_CURRENCIES}
+    rates.update({row.currency: row.rate for row in rows})
+    rates[BASE_CURRENCY] = 1.0
+    return {"base": BASE_CURRENCY, "date": rows[0].published_on.isoformat(), "rates": rates}
+
+
+def build_rate_rows(day: date_type, payload: dict) -> list[ExchangeRate]:
+    published_on = date_type.fromisoformat(payload["date"])
+    return [
+        ExchangeRate(rate_date=day, currency=code, rate=rate, published_on=published_on)
+        for code, rate in payload["rates"].items()
+        if code != BASE_CURRENCY and rate
+    ]
+
+
+async def _store_publication(payload: dict) -> None:
+    day = date_type.fromisoformat(payload["date"])
+    try:
+        async with AsyncSessionLocal() as db:
+            existing = await db.execute(
+                select(ExchangeRate.id).filter(ExchangeRate.rate_date == day)
+            )
+            if existing.first() is not None:
+                return
+            db.add_all(build_rate_rows(day, payload))
+            await db.commit()
+    except IntegrityError:
+        # Stored concurrently by another request or the sync task
+        pass
+    except SQLAlchemyError as err:
+        logger.warning(f"Could not store exchange rates for {day}: {err}")
+
+
+def _is_historical(day: str | None) -> bool:
+    return bool(day) and day < datetime.now(UTC).date().isoformat()
+
+
+def _cache_ttl(endpoint: str | None, data: dict) -> float | None:
+    # Published archive rates never change; "latest", today and fallback answers do
+    if _is_historical(endpoint) and data["date"] == endpoint:
+        return None
+    return settings.currency_cache_today_ttl_seconds
+
+
+async def _read_stored(day: str) -> dict | None:
+    try:
+        async with AsyncSessionLocal() as db:
+            return await read_stored_rates(db, day)
+    except SQLAlchemyError as err:
+        logger.warning(f"Could not read stored exchange rates for {day}: {err}")
+        return None
+
+
+async def load_rates(fetcher: RatesFetcher, endpoint: str | None) -> dict:
+    """Rates for a normalized date (``None`` for latest): cache, then database, then network."""
+
+    async def loader() -> tuple[dict, float | None]:
+        if _is_historical(endpoint):
+            stored = await _read_stored(endpoint)
+            if stored is not None:
+                return stored, None
+
+        data = await fetcher.fetch(endpoint)
+        if _is_historical(endpoint) and data["date"] == endpoint:
+            await _store_publication(data)
+        return data, _cache_ttl(endpoint, data)
+
+    return await rates_cache.get_or_load(endpoint or "latest", loader)
+
+
+async def load_published_rates(fetcher: RatesFetcher, day: str) -> dict:
+    """CBR publication for ``day``; an empty dict when there was none."""
+    cached = rates_cache.get(day)
+    if cached is not None and cached["date"] == day:
+        return cached
+
+    async def loader() -> tuple[dict, float | None]:
+        if _is_historical(day):
+            stored = await _read_stored(day)
+            if stored is not None:
+                return (stored if stored["date"] == day else {}), None
+
+        data = await fetcher.fetch_published(day)
+        if data and _is_historical(day) and data["date"] == day:
+            await _store_publication(data)
+        return data, None if _is_historical(day) else settings.currency_cache_today_ttl_seconds
+
+    return await rates_cache.get_or_load(f"cbr:{day}", loader)
+
+
+async def find_previous_publication(fetcher: RatesFetcher, day: date_type) -> dict | None:
+    for offset in range(1, MAX_FILL_LOOKBACK_DAYS + 1):
+        try:
+            data = await load_published_rates(fetcher, (day - timedelta(days=offset)).isoformat())
+        except (HTTPException, httpx.HTTPError):
+            return None
+        if data:
+            return data
+    return None
+
+
+async def load_rates_for_dates(
+    fetcher: RatesFetcher,
+    days: list[date_type],
+) -> tuple[dict[str, dict], list[str]]:
+    """Rates for each day, forward-filled over weekends and holidays.
+
+    Returns ``(rates_by_date, missing)`` where ``missing`` lists days that could not be resolved.
+    """
+    semaphore = asyncio.Semaphore(settings.currency_batch_concurrency)
+
+    async def load(day: date_type) -> dict | None:
+        async with semaphore:
+            try:
+                return await load_published_rates(fetcher, day.isoformat())
+            except (HTTPException, httpx.HTTPError):
+                return None
+
+    days = sorted(set(days))
+    published = await asyncio.gather(*(load(day) for day in days))
+
+    rates_by_date: dict[str, dict] = {}
+    missing: list[str] = []
+    previous: dict | None = None
+    last_day: date_type | None = None
+    for day, data in zip(days, published, strict=True):
+        # Only a directly preceding day can be carried forward; after a gap or a failed
+        # day the fill starts over from the last publication before ``day``
+        if last_day is None or (day - last_day).days > 1:
+            previous = None
+        last_day = day
+        if data is None:
+            previous = None
+            missing.append(day.isoformat())
+            continue
+        if data:
+            previous = data
+        elif previous is None:
+            previous = await find_previous_publication(fetcher, day)
+
+        if data or previous:
+            rates_by_date[day.isoformat()] = data or previous
+        else:
+            missing.append(day.isoformat())
+
+    return rates_by_date, missing
+
+
+async def load_rate_table(
+    fetcher: RatesFetcher,
+    days: Iterable[date_type | None],
+) -> tuple[dict[str | None, dict], list[str]]:
+    """Rates for every distinct day, keyed by ISO date; ``None`` and future days map to latest."""
+    today = datetime.now(UTC).date()
+    days = set(days)
+    historical = sorted(day for day in days if day is not None and day <= today)
+
+    rates_by_date, missing = await load_rates_for_dates(fetcher, historical)
+    table: dict[str | None, dict] = dict(rates_by_date)
+    if any(day is None or day > today for day in days):
+        table[None] = await load_rates(fetcher, None)
+    return table, missing
+
+
+def rate_key(day: date_type | None) -> str | None:
+    if day is None or day > datetime.now(UTC).date():
+        return None
+    return day.isoformat()
+
+
+def convert_amounts(
+    amounts: Sequence[float],
+    from_currencies: Sequence[str],
+    to_currency: str,
+    keys: Sequence[str | None],
+    rate_table: dict[str | None, dict],
+) -> np.ndarray:
+    """Convert all amounts in one vectorized pass.
+
+    ``keys[i]`` selects the rate_table entry for ``amounts[i]``. Items whose rate is
+    unknown come back as NaN.
+    """
+    count = len(amounts)
+    table_keys = list(rate_table)
+    key_index = {key: index for index, key in enumerate(table_keys)}
+
+    # One row per rate date plus a trailing NaN row for unresolved dates
+    matrix = np.full((len(table_keys) + 1, len(SUPPORTED_CURRENCIES)), np.nan)
+    for row, key in enumerate(table_keys):
+        rates = rate_table[key]["rates"]
+        matrix[row] = [rates.get(code) or np.nan for code in SUPPORTED_CURRENCIES]
+
+    values = np.asarray(amounts, dtype=float)
+    rows = np.fromiter((key_index.get(key, -1) for key in keys), dtype=np.intp, count=count)
+    from_columns = np.fromiter(
+        (CURRENCY_INDEX[code] for code in from_currencies), dtype=np.intp, count=count
+    )
+    to_column = CURRENCY_INDEX[to_currency]
+
+    converted = values / matrix[rows, from_columns] * matrix[rows, to_column]
+    converted = np.where(from_columns == to_column, values, converted)
+    return np.round(converted, 2)
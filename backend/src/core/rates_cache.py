@@ -0,0 +1,125 @@
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+import time
+from typing import Any
+
+Loader = Callable[[], Awaitable[tuple[Any, float | None]]]
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float | None
+    stale_until: float | None
+
+    def is_fresh(self, now: float) -> bool:
+        return self.expires_at is None or self.expires_at > now
+
+    def is_usable(self, now: float) -> bool:
+        return self.stale_until is None or self.stale_until > now
+
+
+class RatesCache:
+    """In-process LRU cache for currency rates with per-entry TTL.
+
+    Concurrent misses for the same key share a single loader call.
+    The loader returns ``(value, ttl)``; ``ttl=None`` keeps the entry until it is evicted.
+    Expired entries are still served for ``stale_ttl`` seconds while a background
+    refresh replaces them.
+    """
+
+    def __init__(self, max_entries: int = 1024, stale_ttl: float = 0):
+        self.max_entries = max_entries
+        self.stale_ttl = stale_ttl
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.stale_hits = 0
+        self.refresh_failures = 0
+
+    def _lookup(self, key: str, now: float) -> _Entry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if not entry.is_usable(now):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get(self, key: str) -> Any | None:
+        now = time.monotonic()
+        entry = self._lookup(key, now)
+        if entry is None or not entry.is_fresh(now):
+            return None
+        return entry.value
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        expires_at = stale_until = None
+        if ttl is not None:
+            expires_at = time.monotonic() + ttl
+            stale_until = expires_at + self.stale_ttl
+        self._entries[key] = _Entry(value=value, expires_at=expires_at, stale_until=stale_until)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_load(self, key: str, loader: Loader) -> Any:
+        now = time.monotonic()
+        entry = self._lookup(key, now)
+        if entry is not None and entry.is_fresh(now):
+            self.hits += 1
+            return entry.value
+
+        if entry is not None:
+            self.stale_hits += 1
+            if key not in self._inflight:
+                task = self._start_load(key, loader)
+                task.add_done_callback(self._on_refresh_done)
+            return entry.value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = self._start_load(key, loader)
+
+        # shield: a cancelled caller must not cancel the fetch other callers wait on
+        return await asyncio.shield(task)
+
+    def _start_load(self, key: str, loader: Loader) -> asyncio.Task:
+        task = asyncio.create_task(self._load(key, loader))
+        self._inflight[key] = task
+        return task
+
+    async def _load(self, key: str, loader: Loader) -> Any:
+        try:
+            value, ttl = await loader()
+            self.set(key, value, ttl)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def _on_refresh_done(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            self.refresh_failures += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "stale_hits": self.stale_hits,
+            "refresh_failures": self.refresh_failures,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "inflight": len(self._inflight),
+        }
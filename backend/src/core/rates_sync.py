@@ -0,0 +1,126 @@
+import asyncio
+from datetime import UTC, date as date_type, datetime, timedelta
+import logging
+
+from fastapi import HTTPException
+import httpx
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import sessionmaker
+
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal
+from src.core.rates import RatesFetcher, build_rate_rows, find_previous_publication
+from src.models.exchange_rate import ExchangeRate
+from src.models.transaction import Transaction
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_CHUNK_DAYS = 31
+
+
+class RatesSync:
+    """Keeps the exchange_rates table filled.
+
+    Backfills every calendar day from the oldest transaction up to today (weekends and
+    holidays carry the previous publication) and prefetches the new CBR rate each morning.
+    """
+
+    def __init__(self, fetcher: RatesFetcher, session_factory: sessionmaker = AsyncSessionLocal):
+        self.fetcher = fetcher
+        self.session_factory = session_factory
+
+    async def _stored_days(self, start: date_type, end: date_type) -> set[date_type]:
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(ExchangeRate.rate_date)
+                .filter(ExchangeRate.rate_date >= start, ExchangeRate.rate_date <= end)
+                .distinct()
+            )
+            return set(result.scalars().all())
+
+    async def _backfill_start(self) -> date_type | None:
+        async with self.session_factory() as db:
+            oldest = (await db.execute(select(func.min(Transaction.transaction_date)))).scalar()
+        if oldest is None:
+            return None
+        return oldest.date() if isinstance(oldest, datetime) else oldest
+
+    async def backfill(self, start: date_type | None = None, end: date_type | None = None) -> int:
+        start = start or await self._backfill_start()
+        # Today's archive may not be published yet; it is picked up by the next run
+        end = end or datetime.now(UTC).date() - timedelta(days=1)
+        if start is None or start > end:
+            return 0
+
+        stored = await self._stored_days(start, end)
+        missing = [
+            start + timedelta(days=offset)
+            for offset in range((end - start).days + 1)
+            if start + timedelta(days=offset) not in stored
+        ]
+
+        semaphore = asyncio.Semaphore(settings.rates_backfill_concurrency)
+
+        async def fetch(day: date_type) -> dict:
+            async with semaphore:
+                return await self.fetcher.fetch_published(day.isoformat())
+
+        filled = 0
+        previous: dict | None = None
+        last_day: date_type | None = None
+        for offset in range(0, len(missing), BACKFILL_CHUNK_DAYS):
+            chunk = missing[offset : offset + BACKFILL_CHUNK_DAYS]
+            published = await asyncio.gather(*(fetch(day) for day in chunk))
+
+            rows: list[ExchangeRate] = []
+            for day, data in zip(chunk, published, strict=True):
+                if last_day is None or (day - last_day).days > 1:
+                    previous = None
+                last_day = day
+                if data:
+                    previous = data
+                elif previous is None:
+                    previous = await find_previous_publication(self.fetcher, day)
+                if data or previous:
+                    rows.extend(build_rate_rows(day, data or previous))
+                    filled += 1
+
+            async with self.session_factory() as db:
+                db.add_all(rows)
+                await db.commit()
+
+        return filled
+
+    async def prefetch_latest(self) -> None:
+        data = await self.fetcher.fetch_published(None)
+        if not data:
+            return
+        day = date_type.fromisoformat(data["date"])
+        if day in await self._stored_days(day, day):
+            return
+        async with self.session_factory() as db:
+            db.add_all(build_rate_rows(day, data))
+            await db.commit()
+
+    async def _sync_once(self) -> None:
+        try:
+            await self.prefetch_latest()
+            filled = await self.backfill()
+            if filled:
+                logger.info(f"Exchange rates backfilled for {filled} days")
+        except (HTTPException, httpx.HTTPError, SQLAlchemyError) as err:
+            logger.warning(f"Exchange rates sync failed: {err}")
+
+    async def run(self) -> None:
+        while True:
+            await self._sync_once()
+            await asyncio.sleep(_seconds_until_next_prefetch())
+
+
+def _seconds_until_next_prefetch() -> float:
+    now = datetime.now(UTC)
+    next_run = now.replace(hour=settings.rates_prefetch_hour_utc, minute=0, second=0, microsecond=0)
+    if next_run <= now:
+        next_run += timedelta(days=1)
+    return (next_run - now).total_seconds()
@@ -0,0 +1,133 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+import time
+from typing import Any
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """Stops calling a provider after repeated failures.
+
+    After ``failure_threshold`` consecutive failures the circuit opens for ``reset_timeout``
+    seconds; then a single trial call is let through and its outcome closes or reopens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.trial_in_flight = False
+        self.total_failures = 0
+        self.total_rejected = 0
+
+    def allow(self) -> bool:
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.total_rejected += 1
+                return False
+            self.state = HALF_OPEN
+            self.trial_in_flight = False
+
+        if self.state == HALF_OPEN:
+            if self.trial_in_flight:
+                self.total_rejected += 1
+                return False
+            self.trial_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.total_failures += 1
+        self.trial_in_flight = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    async def call(self, func: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.allow():
+            raise CircuitOpenError(f"Circuit for {self.name} is open")
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            self.trial_in_flight = False
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "total_failures": self.total_failures,
+            "total_rejected": self.total_rejected,
+        }
+
+
+class HedgeStats:
+    def __init__(self):
+        self.primary_wins = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def stats(self) -> dict:
+        return {
+            "primary_wins": self.primary_wins,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+        }
+
+
+async def hedged(
+    primary: Callable[[], Awaitable[Any]],
+    hedge: Callable[[], Awaitable[Any]],
+    delay: float,
+    stats: HedgeStats,
+) -> Any:
+    """Run ``primary``; if it has not finished after ``delay`` seconds, race it against ``hedge``.
+
+    The first successful result wins and the other call is cancelled. If both fail, the
+    primary's error is raised.
+    """
+    primary_task = asyncio.create_task(primary())
+    pending = {primary_task}
+    try:
+        done, _ = await asyncio.wait(pending, timeout=delay)
+        if done and primary_task.exception() is None:
+            stats.primary_wins += 1
+            return primary_task.result()
+
+        stats.hedged += 1
+        hedge_task = asyncio.create_task(hedge())
+        pending = {hedge_task} if done else {primary_task, hedge_task}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge_task:
+                        stats.hedge_wins += 1
+                    else:
+                        stats.primary_wins += 1
+                    return task.result()
+        raise primary_task.exception()
+    finally:
+        for task in pending:
+            task.cancel()
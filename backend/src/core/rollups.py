@@ -0,0 +1,263 @@
+"""Daily per-user transaction rollups.
+
+Write paths record their changes in a ``RollupDeltas`` and apply it inside the same DB
+transaction. ``python -m src.core.rollups rebuild [--user-id ID]`` rebuilds rollups from scratch.
+"""
+
+import argparse
+import asyncio
+from collections.abc import Mapping
+from datetime import UTC, date, datetime
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import Date, FromClause, Select, and_, cast, delete, func, insert, select, true
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal
+from src.models.transaction import Transaction
+from src.models.transaction_rollup import NO_CATEGORY, TransactionDailyRollup
+
+RollupKey = tuple[int, date, int, str, str]
+
+
+def rollup_day(transaction_date: datetime | None) -> date:
+    if transaction_date is None:
+        transaction_date = datetime.now(UTC)
+    if transaction_date.tzinfo is None:
+        transaction_date = transaction_date.replace(tzinfo=UTC)
+    return transaction_date.astimezone(ZoneInfo(settings.rollup_timezone)).date()
+
+
+class RollupDeltas:
+    def __init__(self):
+        self._deltas: dict[RollupKey, list] = {}
+
+    def add(
+        self,
+        *,
+        user_id: int,
+        transaction_date: datetime | None,
+        category_id: int | None,
+        currency: str,
+        transaction_type: str,
+        amount: float,
+        sign: int = 1,
+    ) -> None:
+        key = (
+            user_id,
+            rollup_day(transaction_date),
+            category_id or NO_CATEGORY,
+            currency,
+            transaction_type,
+        )
+        delta = self._deltas.setdefault(key, [0.0, 0])
+        delta[0] += sign * amount
+        delta[1] += sign
+
+    def add_transaction(self, transaction: Transaction, sign: int = 1) -> None:
+        self.add(
+            user_id=transaction.user_id,
+            transaction_date=transaction.transaction_date,
+            category_id=transaction.category_id,
+            currency=transaction.currency,
+            transaction_type=transaction.transaction_type,
+            amount=transaction.amount,
+            sign=sign,
+        )
+
+    def add_row(self, row: Mapping[str, Any], sign: int = 1) -> None:
+        self.add(
+            user_id=row["user_id"],
+            transaction_date=row["transaction_date"],
+            category_id=row["category_id"],
+            currency=row["currency"],
+            transaction_type=row["transaction_type"],
+            amount=row["amount"],
+            sign=sign,
+        )
+
+    def rows(self) -> list[dict]:
+        return [
+            {
+                "user_id": user_id,
+                "day": day,
+                "category_id": category_id,
+                "currency": currency,
+                "transaction_type": transaction_type,
+                "total": total,
+                "count": count,
+            }
+            for (user_id, day, category_id, currency, transaction_type), (
+                total,
+                count,
+            ) in self._deltas.items()
+            if count or total
+        ]
+
+
+def _upsert(dialect_name: str):
+    if dialect_name == "postgresql":
+        return postgresql.insert(TransactionDailyRollup)
+    return sqlite.insert(TransactionDailyRollup)
+
+
+def _add_on_conflict(stmt):
+    """Add the inserted totals and counts to existing rollup rows."""
+    return stmt.on_conflict_do_update(
+        index_elements=[
+            TransactionDailyRollup.user_id,
+            TransactionDailyRollup.day,
+            TransactionDailyRollup.category_id,
+            TransactionDailyRollup.currency,
+            TransactionDailyRollup.transaction_type,
+        ],
+        set_={
+            "total": TransactionDailyRollup.total + stmt.excluded.total,
+            "count": TransactionDailyRollup.count + stmt.excluded.count,
+        },
+    )
+
+
+async def apply_rollup_deltas(db: AsyncSession, deltas: RollupDeltas) -> None:
+    rows = deltas.rows()
+    if not rows:
+        return
+
+    await db.execute(_add_on_conflict(_upsert(db.get_bind().dialect.name)), rows)
+
+    if any(row["count"] < 0 for row in rows):
+        user_ids = {row["user_id"] for row in rows}
+        await db.execute(
+            delete(TransactionDailyRollup).where(
+                TransactionDailyRollup.user_id.in_(user_ids),
+                TransactionDailyRollup.count <= 0,
+            )
+        )
+
+
+_ROLLUP_COLUMNS = [
+    TransactionDailyRollup.user_id,
+    TransactionDailyRollup.day,
+    TransactionDailyRollup.category_id,
+    TransactionDailyRollup.currency,
+    TransactionDailyRollup.transaction_type,
+    TransactionDailyRollup.total,
+    TransactionDailyRollup.count,
+]
+
+
+def _day_expression(dialect_name: str, transaction_date):
+    if dialect_name == "postgresql":
+        return cast(func.timezone(settings.rollup_timezone, transaction_date), Date)
+    # SQLite stores naive UTC timestamps
+    return func.date(transaction_date)
+
+
+def _rollup_source(dialect_name: str, source: FromClause = Transaction.__table__) -> Select:
+    """Rollup rows of the live transactions in ``source``, a table shaped like transactions."""
+    columns = source.c
+    day = _day_expression(dialect_name, columns.transaction_date)
+    category = func.coalesce(columns.category_id, NO_CATEGORY)
+    return (
+        select(
+            columns.user_id,
+            day.label("day"),
+            category.label("category_id"),
+            columns.currency,
+            columns.transaction_type,
+            func.sum(columns.amount).label("total"),
+            func.count().label("count"),
+        )
+        .filter(columns.deleted_at.is_(None))
+        .group_by(columns.user_id, day, category, columns.currency, columns.transaction_type)
+    )
+
+
+async def rebuild_rollups(db: AsyncSession | AsyncConnection, user_id: int | None = None) -> None:
+    dialect_name = db.get_bind().dialect.name if isinstance(db, AsyncSession) else db.dialect.name
+    source = _rollup_source(dialect_name)
+    clear = delete(TransactionDailyRollup)
+    if user_id is not None:
+        source = source.where(Transaction.user_id == user_id)
+        clear = clear.where(TransactionDailyRollup.user_id == user_id)
+
+    await db.execute(clear)
+    await db.execute(insert(TransactionDailyRollup).from_select(_ROLLUP_COLUMNS, source))
+
+
+async def add_rollups_for_change(db: AsyncSession, user_id: int, change_seq: int) -> None:
+    """Add the transactions written with ``change_seq``, e.g. by a bulk load, to the rollups."""
+    dialect_name = db.get_bind().dialect.name
+    source = _rollup_source(dialect_name).where(
+        Transaction.user_id == user_id, Transaction.change_seq == change_seq
+    )
+    await db.execute(_add_on_conflict(_upsert(dialect_name).from_select(_ROLLUP_COLUMNS, source)))
+
+
+async def subtract_rollups(conn: AsyncConnection, source: FromClause) -> None:
+    """Remove the rows of ``source`` from the rollups, e.g. before detaching a partition."""
+    grouped = _rollup_source(conn.dialect.name, source).subquery()
+    negated = select(
+        grouped.c.user_id,
+        grouped.c.day,
+        grouped.c.category_id,
+        grouped.c.currency,
+        grouped.c.transaction_type,
+        -grouped.c.total,
+        -grouped.c.count,
+    )
+    await conn.execute(
+        _add_on_conflict(_upsert(conn.dialect.name).from_select(_ROLLUP_COLUMNS, negated))
+    )
+    await conn.execute(delete(TransactionDailyRollup).where(TransactionDailyRollup.count <= 0))
+
+
+async def rebuild_rollups_if_empty(conn: AsyncConnection) -> None:
+    """Initial build for databases that had transactions before the rollup table existed."""
+    has_rollups = (await conn.execute(select(TransactionDailyRollup.user_id).limit(1))).first()
+    has_transactions = (await conn.execute(select(Transaction.id).limit(1))).first()
+    if has_transactions and not has_rollups:
+        await rebuild_rollups(conn)
+
+
+def is_day_aligned(start_date: datetime | None, end_date: datetime | None, tz: str) -> bool:
+    """Whether a [start_date, end_date] filter covers whole rollup days."""
+    if tz != settings.rollup_timezone:
+        return False
+    zone = ZoneInfo(tz)
+
+    def local(value: datetime) -> datetime:
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=UTC)
+        return value.astimezone(zone)
+
+    if start_date is not None and local(start_date).time() != datetime.min.time():
+        return False
+    return end_date is None or local(end_date).time() >= datetime.max.time().replace(microsecond=0)
+
+
+def rollup_day_range(start_date: datetime | None, end_date: datetime | None):
+    conditions = []
+    if start_date is not None:
+        conditions.append(TransactionDailyRollup.day >= rollup_day(start_date))
+    if end_date is not None:
+        conditions.append(TransactionDailyRollup.day <= rollup_day(end_date))
+    return and_(true(), *conditions)
+
+
+async def _main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild daily transaction rollups")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--user-id", type=int, default=None)
+    args = parser.parse_args()
+
+    async with AsyncSessionLocal() as db:
+        await rebuild_rollups(db, args.user_id)
+        await db.commit()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
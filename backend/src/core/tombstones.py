@@ -0,0 +1,92 @@
+"""Purging soft-deleted transactions and categories.
+
+Tombstones are kept ``tombstone_retention_days`` so delta sync can report the deletions, then
+removed in batches by a daily task. Each user's ``tombstones_purged_seq`` records the highest
+``change_seq`` purged so far: a sync cursor at or below it may have missed deletions and is
+answered with a full resync, see src/api/v1/sync.py.
+"""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+import logging
+
+from sqlalchemy import bindparam, delete, exists, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal
+from src.models.category import Category
+from src.models.transaction import Transaction
+from src.models.user import User
+
+logger = logging.getLogger(__name__)
+
+PURGE_INTERVAL_SECONDS = 86400
+PURGE_BATCH_ROWS = 10000
+
+
+async def _purge_batch(db: AsyncSession, model, *conditions) -> int:
+    batch = select(model.id).filter(*conditions).limit(PURGE_BATCH_ROWS)
+    result = await db.execute(
+        delete(model)
+        .where(model.id.in_(batch), *conditions)
+        .returning(model.user_id, model.change_seq)
+    )
+    rows = result.all()
+    purged: dict[int, int] = {}
+    for user_id, change_seq in rows:
+        purged[user_id] = max(purged.get(user_id, 0), change_seq)
+
+    if purged:
+        users = User.__table__.c
+        await db.execute(
+            update(User.__table__)
+            .where(
+                users.id == bindparam("user_id"),
+                users.tombstones_purged_seq < bindparam("change_seq"),
+            )
+            .values(tombstones_purged_seq=bindparam("change_seq")),
+            [
+                {"user_id": user_id, "change_seq": change_seq}
+                for user_id, change_seq in purged.items()
+            ],
+        )
+    await db.commit()
+    return len(rows)
+
+
+async def purge_tombstones(db: AsyncSession, before: datetime) -> int:
+    """Delete rows soft-deleted before ``before``; returns the number of deleted rows."""
+    purged = 0
+    for model, conditions in (
+        (Transaction, ()),
+        # Deleted transactions keep their category_id, so their categories wait for them
+        (
+            Category,
+            (
+                ~exists().where(
+                    Transaction.user_id == Category.user_id,
+                    Transaction.category_id == Category.id,
+                ),
+            ),
+        ),
+    ):
+        while count := await _purge_batch(db, model, model.deleted_at < before, *conditions):
+            purged += count
+            if count < PURGE_BATCH_ROWS:
+                break
+    return purged
+
+
+async def run_tombstone_purge() -> None:
+    while True:
+        try:
+            before = datetime.now(UTC) - timedelta(days=settings.tombstone_retention_days)
+            async with AsyncSessionLocal() as db:
+                purged = await purge_tombstones(db, before)
+            if purged:
+                logger.info(f"Purged {purged} deleted rows")
+        except SQLAlchemyError as err:
+            logger.warning(f"Tombstone purge failed: {err}")
+        await asyncio.sleep(PURGE_INTERVAL_SECONDS)
@@ -0,0 +1,638 @@
+"""Import and export of a user's categories and transactions as one JSON document.
+
+Used by the ``/users/me/import`` and ``/users/me/export`` endpoints and by background jobs.
+"""
+
+from collections.abc import AsyncIterator, Awaitable, Callable, Mapping
+from contextlib import suppress
+from datetime import UTC, datetime
+import hashlib
+import struct
+from typing import Any
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    Integer,
+    Select,
+    String,
+    Text,
+    bindparam,
+    cast,
+    func,
+    insert,
+    literal,
+    select,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from src.core.bulk_copy import copy_records, create_staging_table, staging_table, supports_copy
+from src.core.changes import next_change_seq
+from src.core.config import settings
+from src.core.export import compact_json, stream_chunks
+from src.core.json_stream import iter_members
+from src.core.progress import ProgressCallback
+from src.core.rollups import RollupDeltas, add_rollups_for_change, apply_rollup_deltas
+from src.models.category import Category
+from src.models.transaction import Transaction
+from src.models.user import User
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+_MAX_IMPORT_ERRORS = 100
+
+
+def _import_date(txn_data: dict) -> datetime:
+    transaction_date = datetime.now(UTC)
+    if txn_data.get("transaction_date"):
+        with suppress(ValueError, AttributeError):
+            transaction_date = datetime.fromisoformat(
+                txn_data["transaction_date"].replace("Z", "+00:00")
+            )
+    return transaction_date
+
+
+def _fingerprint_amount(amount: float) -> str:
+    """The hex of the amount's IEEE 754 bytes, as PostgreSQL's ``float8send`` gives them.
+
+    Decimal forms differ between Python and PostgreSQL ("100.0" and "100").
+    """
+    return struct.pack(">d", amount).hex()
+
+
+def _fingerprint(content: str, occurrence: int) -> str:
+    return hashlib.md5(f"{content}|{occurrence}".encode()).hexdigest()
+
+
+# Unique index ux_transactions_user_fingerprint
+_FINGERPRINT_KEY = ["user_id", "fingerprint", "transaction_date"]
+
+
+def _insert_new_transactions(dialect_name: str):
+    """INSERT into transactions skipping rows whose fingerprint the user already has."""
+    dialect_insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    return dialect_insert(Transaction).on_conflict_do_nothing(index_elements=_FINGERPRINT_KEY)
+
+
+class _UserImport:
+    """Validates imported items and inserts them in batches of ``import_batch_rows``.
+
+    Items arrive one at a time from the streaming parser; all writes happen in the
+    caller's DB transaction.
+    """
+
+    def __init__(self, db: AsyncSession, user: User, change_seq: int):
+        self.db = db
+        self.user = user
+        self.change_seq = change_seq
+        self.category_ids: set[int] = set()
+        self.category_names: dict[str, int] = {}
+        self.pending_categories: dict[str, dict] = {}
+        self.pending_transactions: list = []
+        self.deltas = RollupDeltas()
+        self.imported_categories = 0
+        self.imported_transactions = 0
+        self.skipped_transactions = 0
+        # Identical rows in one file are told apart by their occurrence number
+        self.occurrences: dict[str, int] = {}
+        self.errors: list[str] = []
+        self.error_count = 0
+
+    def _live_categories(self) -> Select:
+        return select(Category.id, Category.name).filter(
+            Category.user_id == self.user.id, Category.deleted_at.is_(None)
+        )
+
+    async def start(self) -> None:
+        result = await self.db.execute(self._live_categories())
+        for category_id, name in result:
+            self.category_ids.add(category_id)
+            self.category_names[name] = category_id
+        await self._fingerprint_existing()
+
+    async def _fingerprint_existing(self) -> None:
+        """Fingerprint the user's live transactions that have none, as if they were imported.
+
+        Rows created or edited through the API since the last import get theirs here, so an
+        export imported back into its own account is skipped. Only those rows are read, via
+        ix_transactions_user_unfingerprinted. Identical rows take the lowest free occurrences.
+        """
+        table = Transaction.__table__
+        last_id = 0
+        while True:
+            result = await self.db.execute(
+                select(
+                    table.c.id,
+                    table.c.user_id,
+                    table.c.amount,
+                    table.c.currency,
+                    table.c.transaction_type,
+                    table.c.transaction_date,
+                    table.c.description,
+                    table.c.category_id,
+                )
+                .filter(
+                    table.c.user_id == self.user.id,
+                    table.c.fingerprint.is_(None),
+                    table.c.deleted_at.is_(None),
+                    table.c.id > last_id,
+                    table.c.transaction_date.is_not(None),
+                )
+                .order_by(table.c.id)
+                .limit(settings.import_batch_rows)
+            )
+            rows = result.all()
+            if not rows:
+                return
+
+            # The unique key holds the date, so only rows of the same dates can collide
+            used = set(
+                await self.db.scalars(
+                    select(table.c.fingerprint).filter(
+                        table.c.user_id == self.user.id,
+                        table.c.transaction_date.in_({row.transaction_date for row in rows}),
+                        table.c.fingerprint.is_not(None),
+                    )
+                )
+            )
+            fingerprints = []
+            for row in rows:
+                content = self._fingerprint_content(row._mapping)
+                occurrence = 1
+                while (fingerprint := _fingerprint(content, occurrence)) in used:
+                    occurrence += 1
+                used.add(fingerprint)
+                fingerprints.append({"row_id": row.id, "row_fingerprint": fingerprint})
+
+            # Not a change to the user's data: change_seq and updated_at stay
+            await self.db.execute(
+                update(table)
+                .where(table.c.id == bindparam("row_id"))
+                .values(fingerprint=bindparam("row_fingerprint"), updated_at=table.c.updated_at),
+                fingerprints,
+            )
+            last_id = rows[-1].id
+
+    def _error(self, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < _MAX_IMPORT_ERRORS:
+            self.errors.append(message)
+
+    async def add_category(self, cat_data: Any) -> None:
+        try:
+            if not isinstance(cat_data, dict) or "name" not in cat_data:
+                return
+
+            name = cat_data["name"]
+            if name in self.category_names or name in self.pending_categories:
+                return
+
+            self.pending_categories[name] = {
+                "name": name,
+                "description": cat_data.get("description"),
+                "icon": cat_data.get("icon", "1"),
+                "user_id": self.user.id,
+                "change_seq": self.change_seq,
+            }
+        except Exception as err:
+            self._error(f"Error importing category {cat_data.get('name', 'unknown')}: {err}")
+            return
+
+        if len(self.pending_categories) >= settings.import_batch_rows:
+            await self.flush_categories()
+
+    async def add_transaction(self, txn_data: Any) -> None:
+        if not isinstance(txn_data, dict):
+            return
+        if "amount" not in txn_data or "transaction_type" not in txn_data:
+            return
+
+        # Transactions may refer to categories imported just before them
+        await self.flush_categories()
+
+        try:
+            self.pending_transactions.append(self._transaction_row(txn_data))
+        except Exception as err:
+            self._error(f"Error importing transaction: {err}")
+            return
+
+        if len(self.pending_transactions) >= settings.import_batch_rows:
+            await self.flush_transactions()
+
+    def _transaction_row(self, txn_data: dict) -> dict:
+        category_id = None
+        if txn_data.get("category_id") in self.category_ids:
+            category_id = txn_data["category_id"]
+        elif txn_data.get("category_name") in self.category_names:
+            category_id = self.category_names[txn_data["category_name"]]
+
+        row = {
+            "amount": float(txn_data["amount"]),
+            "currency": txn_data.get("currency", "RUB"),
+            "description": txn_data.get("description"),
+            "transaction_type": txn_data["transaction_type"],
+            "category_id": category_id,
+            "transaction_date": _import_date(txn_data),
+            "user_id": self.user.id,
+            "change_seq": self.change_seq,
+        }
+        content = self._fingerprint_content(row)
+        occurrence = self.occurrences[content] = self.occurrences.get(content, 0) + 1
+        row["fingerprint"] = _fingerprint(content, occurrence)
+        return row
+
+    @staticmethod
+    def _fingerprint_content(row: Mapping[str, Any]) -> str:
+        transaction_date = row["transaction_date"]
+        if transaction_date.tzinfo is None:
+            transaction_date = transaction_date.replace(tzinfo=UTC)
+        return "|".join(
+            [
+                str(row["user_id"]),
+                _fingerprint_amount(row["amount"]),
+                str(row["currency"]),
+                str(row["transaction_type"]),
+                transaction_date.astimezone(UTC).strftime("%Y-%m-%dT%H:%M:%S.%f"),
+                str(row["description"] or ""),
+                "" if row["category_id"] is None else str(row["category_id"]),
+            ]
+        )
+
+    async def flush_categories(self) -> None:
+        if not self.pending_categories:
+            return
+
+        result = await self.db.execute(
+            insert(Category).returning(Category.id, Category.name),
+            list(self.pending_categories.values()),
+        )
+        for category_id, name in result:
+            self.category_ids.add(category_id)
+            self.category_names[name] = category_id
+        self.imported_categories += len(self.pending_categories)
+        self.pending_categories.clear()
+
+    async def flush_transactions(self) -> None:
+        if not self.pending_transactions:
+            return
+
+        # Rows imported before are skipped; only the inserted ones come back
+        result = await self.db.execute(
+            _insert_new_transactions(self.db.get_bind().dialect.name).returning(
+                Transaction.user_id,
+                Transaction.transaction_date,
+                Transaction.category_id,
+                Transaction.currency,
+                Transaction.transaction_type,
+                Transaction.amount,
+            ),
+            self.pending_transactions,
+        )
+        inserted = result.all()
+        for row in inserted:
+            self.deltas.add_row(row._mapping)
+        self.imported_transactions += len(inserted)
+        self.skipped_transactions += len(self.pending_transactions) - len(inserted)
+        self.pending_transactions.clear()
+
+    async def finish(self) -> None:
+        await self.flush_categories()
+        await self.flush_transactions()
+        # Deltas grow with distinct days and categories, not rows, so they are applied once
+        await apply_rollup_deltas(self.db, self.deltas)
+
+    def error_report(self) -> list[str] | None:
+        if self.error_count > len(self.errors):
+            return [*self.errors, f"... and {self.error_count - len(self.errors)} more errors"]
+        return self.errors or None
+
+
+_import_categories_staging = staging_table(
+    "import_categories",
+    Column("position", Integer),
+    Column("name", String),
+    Column("description", String),
+    Column("icon", String),
+)
+_import_transactions_staging = staging_table(
+    "import_transactions",
+    Column("position", Integer),
+    Column("amount", Float),
+    Column("currency", String),
+    Column("description", String),
+    Column("transaction_type", String),
+    Column("category_id", Integer),
+    Column("category_name", String),
+    Column("transaction_date", DateTime(timezone=True)),
+)
+
+
+class _CopyUserImport(_UserImport):
+    """PostgreSQL on asyncpg: rows are COPied into staging tables, then moved with
+    INSERT ... SELECT, which skips existing category names and resolves categories in SQL.
+    """
+
+    def __init__(self, db: AsyncSession, user: User, change_seq: int):
+        super().__init__(db, user, change_seq)
+        self.pending_categories: list[tuple] = []
+        self.category_position = 0
+        self.transaction_position = 0
+        self.staged_transactions = 0
+
+    async def start(self) -> None:
+        await self._fingerprint_existing()
+        await create_staging_table(self.db, _import_categories_staging)
+        await create_staging_table(self.db, _import_transactions_staging)
+
+    async def add_category(self, cat_data: Any) -> None:
+        if not isinstance(cat_data, dict) or "name" not in cat_data:
+            return
+
+        # Among duplicate names the first one is imported, as in the batched path
+        self.category_position += 1
+        self.pending_categories.append(
+            (
+                self.category_position,
+                cat_data["name"],
+                cat_data.get("description"),
+                cat_data.get("icon", "1"),
+            )
+        )
+        if len(self.pending_categories) >= settings.import_batch_rows:
+            await self.flush_categories()
+
+    def _transaction_row(self, txn_data: dict) -> tuple:
+        category_id = txn_data.get("category_id")
+        category_name = txn_data.get("category_name")
+        self.transaction_position += 1
+        return (
+            self.transaction_position,
+            float(txn_data["amount"]),
+            txn_data.get("currency", "RUB"),
+            txn_data.get("description"),
+            txn_data["transaction_type"],
+            category_id if isinstance(category_id, int) else None,
+            category_name if isinstance(category_name, str) else None,
+            _import_date(txn_data),
+        )
+
+    async def flush_categories(self) -> None:
+        if self.pending_categories:
+            await copy_records(self.db, _import_categories_staging, self.pending_categories)
+            self.pending_categories.clear()
+
+    async def flush_transactions(self) -> None:
+        if self.pending_transactions:
+            await copy_records(self.db, _import_transactions_staging, self.pending_transactions)
+            self.staged_transactions += len(self.pending_transactions)
+            self.pending_transactions.clear()
+
+    async def finish(self) -> None:
+        await self.flush_categories()
+        await self.flush_transactions()
+
+        staged = _import_categories_staging.c
+        existing = self._live_categories().filter(Category.name == staged.name).exists()
+        result = await self.db.execute(
+            insert(Category).from_select(
+                [
+                    "name",
+                    "description",
+                    "icon",
+                    "user_id",
+                    "change_seq",
+                    "created_at",
+                    "updated_at",
+                ],
+                select(
+                    staged.name,
+                    staged.description,
+                    staged.icon,
+                    literal(self.user.id),
+                    literal(self.change_seq),
+                    func.now(),
+                    func.now(),
+                )
+                .distinct(staged.name)
+                .filter(~existing)
+                .order_by(staged.name, staged.position),
+            )
+        )
+        self.imported_categories = result.rowcount
+
+        staged = _import_transactions_staging.c
+        owned = self._live_categories().subquery()
+        named = (
+            self._live_categories()
+            .with_only_columns(func.max(Category.id).label("id"), Category.name)
+            .group_by(Category.name)
+            .subquery()
+        )
+        category_id = func.coalesce(owned.c.id, named.c.id)
+        # The fields of _UserImport._fingerprint_content
+        content = func.concat_ws(
+            "|",
+            literal(str(self.user.id)),
+            func.encode(func.float8send(staged.amount), "hex"),
+            staged.currency,
+            staged.transaction_type,
+            func.to_char(
+                func.timezone("UTC", staged.transaction_date), 'YYYY-MM-DD"T"HH24:MI:SS.US'
+            ),
+            func.coalesce(staged.description, ""),
+            func.coalesce(cast(category_id, Text), ""),
+            type_=Text,
+        )
+        resolved = (
+            select(
+                staged.position,
+                staged.amount,
+                staged.currency,
+                staged.description,
+                staged.transaction_type,
+                staged.transaction_date,
+                category_id.label("category_id"),
+                content.label("content"),
+            )
+            .select_from(_import_transactions_staging)
+            .outerjoin(owned, owned.c.id == staged.category_id)
+            .outerjoin(named, named.c.name == staged.category_name)
+            .subquery("resolved")
+        )
+        occurrence = func.row_number().over(
+            partition_by=resolved.c.content, order_by=resolved.c.position
+        )
+        numbered = select(resolved, occurrence.label("occurrence")).subquery("numbered")
+        rows = numbered.c
+        result = await self.db.execute(
+            _insert_new_transactions("postgresql").from_select(
+                [
+                    "amount",
+                    "currency",
+                    "description",
+                    "transaction_type",
+                    "category_id",
+                    "transaction_date",
+                    "user_id",
+                    "change_seq",
+                    "fingerprint",
+                    "created_at",
+                    "updated_at",
+                ],
+                select(
+                    rows.amount,
+                    rows.currency,
+                    rows.description,
+                    rows.transaction_type,
+                    rows.category_id,
+                    rows.transaction_date,
+                    literal(self.user.id),
+                    literal(self.change_seq),
+                    func.md5(rows.content + "|" + cast(rows.occurrence, Text)),
+                    func.now(),
+                    func.now(),
+                ),
+            )
+        )
+        self.imported_transactions = result.rowcount
+        self.skipped_transactions = self.staged_transactions - result.rowcount
+        await add_rollups_for_change(self.db, self.user.id, self.change_seq)
+
+
+_EXPORT_CATEGORY_COLUMNS = (
+    Category.id,
+    Category.name,
+    Category.description,
+    Category.icon,
+    Category.created_at,
+)
+_EXPORT_TRANSACTION_COLUMNS = (
+    Transaction.id,
+    Transaction.amount,
+    Transaction.currency,
+    Transaction.description,
+    Transaction.transaction_type,
+    Transaction.category_id,
+    Transaction.transaction_date,
+    Transaction.created_at,
+)
+
+
+async def _export_array(
+    db: AsyncSession, query: Select, on_rows: Callable[[int], Awaitable[None]]
+) -> AsyncIterator[str]:
+    fields = [column["name"] for column in query.column_descriptions]
+    separator = ""
+    async for rows in stream_chunks(query, db):
+        yield separator + ",".join(
+            compact_json(dict(zip(fields, row, strict=True))) for row in rows
+        )
+        separator = ","
+        await on_rows(len(rows))
+
+
+async def export_document(
+    user: User,
+    session_factory: sessionmaker,
+    on_progress: ProgressCallback | None = None,
+) -> AsyncIterator[str]:
+    """The export document of ``user``'s live data, in chunks of ``export_chunk_rows`` rows.
+
+    Categories and transactions are read in one session. On PostgreSQL it is a REPEATABLE
+    READ transaction, so both come from one snapshot and every exported category_id refers
+    to an exported category. SQLite reads without a transaction: a read lock held for the
+    whole export would block every writer, including the job's progress updates.
+    """
+    exported = 0
+
+    async def on_rows(count: int) -> None:
+        nonlocal exported
+        exported += count
+        if on_progress:
+            await on_progress(exported)
+
+    header = compact_json(
+        {
+            "version": "1.0",
+            "export_date": datetime.now(UTC),
+            "user": {
+                "id": user.id,
+                "username": user.username,
+                "created_at": user.created_at,
+            },
+        }
+    )
+    yield header[:-1] + ',"categories":['
+    async with session_factory() as db:
+        if db.get_bind().dialect.name == "postgresql":
+            await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        async for chunk in _export_array(
+            db,
+            select(*_EXPORT_CATEGORY_COLUMNS)
+            .filter(Category.user_id == user.id, Category.deleted_at.is_(None))
+            .order_by(Category.id),
+            on_rows,
+        ):
+            yield chunk
+        yield '],"transactions":['
+        async for chunk in _export_array(
+            db,
+            select(*_EXPORT_TRANSACTION_COLUMNS)
+            .filter(Transaction.user_id == user.id, Transaction.deleted_at.is_(None))
+            .order_by(Transaction.transaction_date, Transaction.id),
+            on_rows,
+        ):
+            yield chunk
+    yield "]}"
+
+
+async def import_document(
+    db: AsyncSession,
+    user: User,
+    read: Callable[[int], Awaitable[bytes]],
+    on_progress: ProgressCallback | None = None,
+) -> dict:
+    """Import the export document read with ``read(size)`` into ``user``'s data.
+
+    Writes in ``db``'s transaction; the caller commits, or rolls back on an exception.
+    """
+    importer_class = _CopyUserImport if supports_copy(db) else _UserImport
+    importer = importer_class(db, user, await next_change_seq(db, user))
+    await importer.start()
+
+    has_version = False
+    processed = 0
+    async for key, value, is_element in iter_members(read):
+        if key == "version":
+            has_version = True
+            continue
+        if key == "categories" and is_element:
+            await importer.add_category(value)
+        elif key == "transactions" and is_element:
+            await importer.add_transaction(value)
+        else:
+            continue
+        processed += 1
+        if on_progress and processed % settings.import_batch_rows == 0:
+            await on_progress(processed)
+
+    if not has_version:
+        raise ImportFormatError("Invalid import file format: missing version")
+
+    await importer.finish()
+    if on_progress:
+        await on_progress(processed)
+
+    return {
+        "imported_categories": importer.imported_categories,
+        "imported_transactions": importer.imported_transactions,
+        "skipped_transactions": importer.skipped_transactions,
+        "errors": importer.error_report(),
+    }
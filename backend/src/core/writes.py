@@ -0,0 +1,79 @@
+"""Guarded single-statement writes to a user's live (not deleted) rows."""
+
+from typing import Any
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.category import Category
+from src.models.transaction import Transaction
+
+OwnedModel = type[Transaction] | type[Category]
+
+
+def _guard(model: OwnedModel, row_id: int, user_id: int) -> tuple:
+    return model.id == row_id, model.user_id == user_id, model.deleted_at.is_(None)
+
+
+async def update_owned(
+    db: AsyncSession,
+    model: OwnedModel,
+    *,
+    row_id: int,
+    user_id: int,
+    values: dict[str, Any],
+) -> dict | None:
+    """``UPDATE ... WHERE id = :id AND user_id = :uid RETURNING *``; None when no row matched."""
+    result = await db.execute(
+        update(model)
+        .where(*_guard(model, row_id, user_id))
+        .values(values)
+        .returning(*model.__table__.columns)
+        .execution_options(synchronize_session=False)
+    )
+    row = result.first()
+    return dict(row._mapping) if row else None
+
+
+async def update_owned_with_previous(
+    db: AsyncSession,
+    model: OwnedModel,
+    *,
+    row_id: int,
+    user_id: int,
+    values: dict[str, Any],
+) -> tuple[dict, dict] | None:
+    """Like ``update_owned`` but returns ``(previous, updated)`` rows.
+
+    On PostgreSQL this is one ``UPDATE ... FROM (SELECT ...) RETURNING``: the FROM snapshot
+    still holds the previous values. Other dialects cannot return FROM columns, so the row is
+    read first.
+    """
+    table = model.__table__
+    if db.get_bind().dialect.name != "postgresql":
+        previous = (await db.execute(select(table).where(*_guard(model, row_id, user_id)))).first()
+        if previous is None:
+            return None
+        updated = await update_owned(db, model, row_id=row_id, user_id=user_id, values=values)
+        return dict(previous._mapping), updated
+
+    previous = select(table).where(*_guard(model, row_id, user_id)).subquery("previous")
+    result = await db.execute(
+        update(model)
+        .where(model.id == previous.c.id)
+        .values(values)
+        .returning(
+            *table.columns,
+            *(column.label(f"previous_{column.name}") for column in previous.columns),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    row = result.first()
+    if row is None:
+        return None
+
+    mapping = row._mapping
+    return (
+        {column.name: mapping[f"previous_{column.name}"] for column in previous.columns},
+        {column.name: mapping[column.name] for column in table.columns},
+    )
@@ -1,4 +1,5 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 import logging
 import os
 import sys
@@ -10,15 +11,34 @@ from sentry_sdk.integrations.fastapi import FastApiIntegration
 from sentry_sdk.integrations.logging import LoggingIntegration
 
 from src.api.v1 import (
+    analytics_router,
     auth_router,
     categories_router,
     currency_router,
+    jobs_router,
+    sync_router,
     transactions_router,
     users_router,
 )
 from src.core.config import settings
-from src.core.database import Base, engine
-from src.models import Category, RefreshToken, Transaction, User  # noqa: F401
+from src.core.database import engine, sync_schema
+from src.core.http import create_http_client
+from src.core.jobs import JobRunner
+from src.core.pagination import NEXT_CURSOR_HEADER
+from src.core.partitions import run_partition_maintenance, sync_partitions
+from src.core.rates import RatesFetcher
+from src.core.rates_sync import RatesSync
+from src.core.rollups import rebuild_rollups_if_empty
+from src.core.tombstones import run_tombstone_purge
+from src.models import (  # noqa: F401
+    Category,
+    ExchangeRate,
+    Job,
+    RefreshToken,
+    Transaction,
+    TransactionDailyRollup,
+    User,
+)
 
 logging.basicConfig(
     level=logging.INFO,
@@ -32,13 +52,33 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     try:
         async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
+            await sync_partitions(conn)
+            await sync_schema(conn)
+            await rebuild_rollups_if_empty(conn)
         logger.info("✓ Database connected")
     except Exception as err:
         logger.warning(f"Database connection failed: {err}")
 
+    app.state.http_client = create_http_client()
+
+    app.state.job_runner = JobRunner()
+    background_tasks = [
+        asyncio.create_task(app.state.job_runner.run()),
+        asyncio.create_task(run_tombstone_purge()),
+    ]
+    if settings.rates_sync_enabled:
+        rates_sync = RatesSync(RatesFetcher(app.state.http_client))
+        background_tasks.append(asyncio.create_task(rates_sync.run()))
+    if settings.transactions_partitioned:
+        background_tasks.append(asyncio.create_task(run_partition_maintenance()))
+
     yield
 
+    for task in background_tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await app.state.http_client.aclose()
     await engine.dispose()
 
 
@@ -66,6 +106,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 app.include_router(auth_router, prefix="/api/v1")
@@ -73,6 +114,9 @@ app.include_router(users_router, prefix="/api/v1")
 app.include_router(categories_router, prefix="/api/v1")
 app.include_router(transactions_router, prefix="/api/v1")
 app.include_router(currency_router, prefix="/api/v1")
+app.include_router(sync_router, prefix="/api/v1")
+app.include_router(analytics_router, prefix="/api/v1")
+app.include_router(jobs_router, prefix="/api/v1")
 
 
 @app.get("/health")
@@ -1,6 +1,17 @@
 from .category import Category
+from .exchange_rate import ExchangeRate
+from .job import Job
 from .refresh_token import RefreshToken
 from .transaction import Transaction
+from .transaction_rollup import TransactionDailyRollup
 from .user import User
 
-__all__ = ["Category", "RefreshToken", "Transaction", "User"]
+__all__ = [
+    "Category",
+    "ExchangeRate",
+    "Job",
+    "RefreshToken",
+    "Transaction",
+    "TransactionDailyRollup",
+    "User",
+]
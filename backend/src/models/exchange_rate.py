@@ -0,0 +1,21 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import Column, Date, DateTime, Float, Integer, String, UniqueConstraint
+
+from src.core.database import Base
+
+
+class ExchangeRate(Base):
+    __tablename__ = "exchange_rates"
+    __table_args__ = (
+        UniqueConstraint("rate_date", "currency", name="uq_exchange_rates_date_currency"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    rate_date = Column(Date, nullable=False, index=True)
+    currency = Column(String, nullable=False)
+    # Units of currency per 1 RUB, as returned by /currency/rates
+    rate = Column(Float, nullable=False)
+    # CBR publication the rate comes from; earlier than rate_date on weekends and holidays
+    published_on = Column(Date, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(UTC))
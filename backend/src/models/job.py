@@ -0,0 +1,38 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Index, Integer, String
+
+from src.core.database import Base
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Runner: oldest queued job, running jobs with a stale heartbeat
+        Index("ix_jobs_status_id", "status", "id"),
+        Index("ix_jobs_user_id_id", "user_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    kind = Column(String, nullable=False)
+    status = Column(String, nullable=False, default=JOB_QUEUED)
+    # Rows processed so far, out of total when it is known upfront
+    progress = Column(Integer, nullable=False, default=0, server_default="0")
+    total = Column(Integer, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    # File names inside settings.jobs_dir: the uploaded input and the downloadable result
+    input_file = Column(String, nullable=True)
+    artifact_file = Column(String, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(UTC))
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    # Refreshed while the job runs; a stale heartbeat means its process died
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,20 +1,88 @@
 from datetime import UTC, datetime
 
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    func,
+    literal_column,
+    text,
+)
 from sqlalchemy.orm import relationship
 
-from src.core.database import Base
+from src.core.database import Base, has_pg_trgm
+
+# Full-text search document over descriptions. "simple" skips stemming, which suits
+# descriptions mixing languages. Must match the ix_transactions_description_fts expression
+# for the index to be used.
+SEARCH_CONFIG = "simple"
+DESCRIPTION_DOCUMENT_SQL = f"to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(description, ''))"
 
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Keyset pagination: WHERE user_id = ? ORDER BY transaction_date DESC, id DESC.
+        # Also serves (user_id, transaction_date) range filters through its prefix.
+        Index("ix_transactions_user_date_id", "user_id", "transaction_date", "id"),
+        Index("ix_transactions_user_category", "user_id", "category_id"),
+        Index(
+            "ix_transactions_user_type_date",
+            "user_id",
+            "transaction_type",
+            "transaction_date",
+        ),
+        # Delta sync: WHERE user_id = ? AND (change_seq, id) > (?, ?) ORDER BY change_seq, id
+        Index("ix_transactions_user_change_seq", "user_id", "change_seq", "id"),
+        # Tombstone purge: WHERE deleted_at < ?
+        Index(
+            "ix_transactions_deleted_at",
+            "deleted_at",
+            postgresql_where=text("deleted_at IS NOT NULL"),
+            sqlite_where=text("deleted_at IS NOT NULL"),
+        ),
+        # Import deduplication. transaction_date is in the key because unique indexes of
+        # partitioned tables must contain the partition key; the fingerprint covers it anyway.
+        Index(
+            "ux_transactions_user_fingerprint",
+            "user_id",
+            "fingerprint",
+            "transaction_date",
+            unique=True,
+        ),
+        # Live rows an import has yet to fingerprint: created or edited since the last import
+        Index(
+            "ix_transactions_user_unfingerprinted",
+            "user_id",
+            "id",
+            postgresql_where=text("fingerprint IS NULL AND deleted_at IS NULL"),
+            sqlite_where=text("fingerprint IS NULL AND deleted_at IS NULL"),
+        ),
+        # Description search (PostgreSQL only): full-text matches and trigram substring /
+        # fuzzy matches. The trigram index needs the pg_trgm extension, see sync_schema.
+        Index(
+            "ix_transactions_description_fts",
+            text(DESCRIPTION_DOCUMENT_SQL),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_transactions_description_trgm",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql", callable_=has_pg_trgm),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     amount = Column(Float, nullable=False)
     currency = Column(String, nullable=False, default="RUB")
     description = Column(String, nullable=True)
     transaction_type = Column(String, nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
     transaction_date = Column(DateTime(timezone=True), default=lambda: datetime.now(UTC))
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(UTC))
@@ -23,6 +91,20 @@ class Transaction(Base):
         default=lambda: datetime.now(UTC),
         onupdate=lambda: datetime.now(UTC),
     )
+    # users.data_version at the time of the last write, see src/core/changes.py
+    change_seq = Column(Integer, nullable=False, default=0, server_default="0")
+    # Hash of the content for import deduplication, see src/core/user_data.py. Writes reset
+    # it to NULL and deletes clear it; the next import fills in the missing ones.
+    fingerprint = Column(String, nullable=True)
+    # Tombstone: deleted rows stay until purged so delta sync can report them
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
 
     user = relationship("User", back_populates="transactions")
     category = relationship("Category", back_populates="transactions")
+
+
+def description_document():
+    return func.to_tsvector(
+        literal_column(f"'{SEARCH_CONFIG}'::regconfig"),
+        func.coalesce(Transaction.description, literal_column("''")),
+    )
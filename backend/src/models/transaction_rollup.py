@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Date, Float, ForeignKey, Integer, String
+
+from src.core.database import Base
+
+# Rollup rows use 0 instead of NULL so uncategorized amounts share one upsertable key
+NO_CATEGORY = 0
+
+
+class TransactionDailyRollup(Base):
+    __tablename__ = "transaction_daily_rollups"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    category_id = Column(Integer, primary_key=True, default=NO_CATEGORY)
+    currency = Column(String, primary_key=True)
+    transaction_type = Column(String, primary_key=True)
+    total = Column(Float, nullable=False, default=0.0)
+    count = Column(Integer, nullable=False, default=0)
@@ -19,6 +19,16 @@ class User(Base):
         default=lambda: datetime.now(UTC),
         onupdate=lambda: datetime.now(UTC),
     )
+    # Bumped by every write to the user's transactions or categories
+    data_version = Column(Integer, nullable=False, default=0, server_default="0")
+    # Highest change_seq of the user's purged tombstones, see src/core/tombstones.py
+    tombstones_purged_seq = Column(Integer, nullable=False, default=0, server_default="0")
 
-    transactions = relationship("Transaction", back_populates="user", cascade="all, delete-orphan")
-    categories = relationship("Category", back_populates="user", cascade="all, delete-orphan")
+    # Deleting a user never loads these: the foreign keys cascade in the database, and
+    # account deletion purges them in batches first, see src/core/accounts.py
+    transactions = relationship(
+        "Transaction", back_populates="user", cascade="all, delete-orphan", passive_deletes=True
+    )
+    categories = relationship(
+        "Category", back_populates="user", cascade="all, delete-orphan", passive_deletes=True
+    )
@@ -1,15 +1,45 @@
+from src.schemas.analytics import ExpenseForecastPoint
 from src.schemas.category import CategoryCreate, CategoryResponse, CategoryUpdate
+from src.schemas.currency import (
+    CurrencyConvertBatchRequest,
+    CurrencyConvertBatchResponse,
+    CurrencyRatesBatchRequest,
+)
+from src.schemas.job import JobResponse
+from src.schemas.sync import SyncChangesResponse
 from src.schemas.token import TokenResponse
-from src.schemas.transaction import TransactionCreate, TransactionResponse, TransactionUpdate
+from src.schemas.transaction import (
+    TransactionBulkCreate,
+    TransactionBulkDelete,
+    TransactionBulkDeleteResponse,
+    TransactionBulkResponse,
+    TransactionBulkUpdate,
+    TransactionCreate,
+    TransactionResponse,
+    TransactionSummaryResponse,
+    TransactionUpdate,
+)
 from src.schemas.user import UserCreate, UserLogin, UserResponse, UserUpdate
 
 __all__ = [
     "CategoryCreate",
     "CategoryResponse",
     "CategoryUpdate",
+    "CurrencyConvertBatchRequest",
+    "CurrencyConvertBatchResponse",
+    "CurrencyRatesBatchRequest",
+    "ExpenseForecastPoint",
+    "JobResponse",
+    "SyncChangesResponse",
     "TokenResponse",
+    "TransactionBulkCreate",
+    "TransactionBulkDelete",
+    "TransactionBulkDeleteResponse",
+    "TransactionBulkResponse",
+    "TransactionBulkUpdate",
     "TransactionCreate",
     "TransactionResponse",
+    "TransactionSummaryResponse",
     "TransactionUpdate",
     "UserCreate",
     "UserLogin",
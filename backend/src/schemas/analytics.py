@@ -0,0 +1,12 @@
+from datetime import date
+
+from pydantic import BaseModel, ConfigDict
+from pydantic.alias_generators import to_camel
+
+
+class ExpenseForecastPoint(BaseModel):
+    # Same shape as ExpenseForecastPoint in frontend/src/ml/expensePredictor.ts
+    date: date
+    predicted_expense: float
+
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
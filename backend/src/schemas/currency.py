@@ -0,0 +1,33 @@
+from datetime import date
+from typing import Annotated
+
+from pydantic import BaseModel, Field, model_validator
+
+CurrencyCode = Annotated[str, Field(pattern="^(RUB|USD|EUR|AED)$")]
+
+
+class CurrencyRatesBatchRequest(BaseModel):
+    dates: list[date] = []
+    start_date: date | None = None
+    end_date: date | None = None
+
+
+class CurrencyConvertBatchRequest(BaseModel):
+    amounts: list[float]
+    from_currencies: list[CurrencyCode]
+    to_currency: CurrencyCode
+    dates: list[date | None] | None = None
+
+    @model_validator(mode="after")
+    def check_lengths(self) -> "CurrencyConvertBatchRequest":
+        if len(self.from_currencies) != len(self.amounts):
+            raise ValueError("from_currencies must have the same length as amounts")
+        if self.dates is not None and len(self.dates) != len(self.amounts):
+            raise ValueError("dates must have the same length as amounts")
+        return self
+
+
+class CurrencyConvertBatchResponse(BaseModel):
+    to: str
+    converted: list[float | None]
+    missing_dates: list[str]
@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict
+
+
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    status: str
+    progress: int
+    total: int | None
+    attempts: int
+    result: dict[str, Any] | None
+    error: str | None
+    # Download URL of the job's result file, once it succeeded
+    artifact_url: str | None = None
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+
+from src.schemas.category import CategoryResponse
+from src.schemas.transaction import TransactionResponse
+
+
+class SyncChangesResponse(BaseModel):
+    cursor: str
+    has_more: bool
+    # The cursor was older than the tombstone retention: this is a full resync from the start
+    reset: bool = False
+    transactions: list[TransactionResponse]
+    categories: list[CategoryResponse]
+    deleted_transaction_ids: list[int]
+    deleted_category_ids: list[int]
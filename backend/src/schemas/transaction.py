@@ -1,4 +1,5 @@
-from datetime import datetime
+from datetime import date, datetime
+from typing import Any
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
@@ -35,5 +36,63 @@ class TransactionResponse(TransactionBase):
     user_id: int
     created_at: datetime
     updated_at: datetime
+    converted_amount: float | None = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class TransactionSummaryItem(BaseModel):
+    transaction_type: str
+    currency: str
+    total: float
+    count: int
+
+
+class TransactionCategorySummary(TransactionSummaryItem):
+    category_id: int | None
+
+
+class TransactionPeriodSummary(TransactionSummaryItem):
+    period: date
+
+
+class TransactionSummaryResponse(BaseModel):
+    granularity: str
+    timezone: str
+    totals: list[TransactionSummaryItem]
+    by_category: list[TransactionCategorySummary]
+    by_period: list[TransactionPeriodSummary]
+
+
+class TransactionBulkUpdateItem(TransactionUpdate):
+    id: int
+
+
+class TransactionBulkCreate(BaseModel):
+    # Items are validated one by one so a malformed entry is reported instead of
+    # rejecting the whole batch
+    items: list[dict[str, Any]]
+
+
+class TransactionBulkUpdate(BaseModel):
+    items: list[dict[str, Any]]
+
+
+class TransactionBulkDelete(BaseModel):
+    ids: list[int]
+
+
+class TransactionBulkError(BaseModel):
+    index: int
+    id: int | None = None
+    detail: str
+
+
+class TransactionBulkResponse(BaseModel):
+    items: list[TransactionResponse]
+    errors: list[TransactionBulkError]
+
+
+class TransactionBulkDeleteResponse(BaseModel):
+    deleted_ids: list[int]
+    errors: list[TransactionBulkError]
@@ -0,0 +1,34 @@
+"""Helpers for the opt-in benchmarks; see pyproject.toml for how to run them."""
+
+from collections.abc import Awaitable, Callable
+import statistics
+import time
+
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+TimedGet = Callable[..., Awaitable[float]]
+
+
+@pytest.fixture
+def postgresql(db: AsyncSession) -> None:
+    """Skip benchmarks that seed millions of rows unless TEST_DATABASE_URL is PostgreSQL."""
+    if db.get_bind().dialect.name != "postgresql":
+        pytest.skip("needs TEST_DATABASE_URL pointing at PostgreSQL")
+
+
+@pytest.fixture
+def timed_get(client: httpx.AsyncClient) -> TimedGet:
+    async def median_ms(path: str, params: dict | None = None, runs: int = 5) -> float:
+        """Median latency of ``GET path`` in milliseconds, after one warm-up request."""
+        response = await client.get(path, params=params)
+        assert response.status_code == 200, response.text
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            await client.get(path, params=params)
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
+
+    return median_ms
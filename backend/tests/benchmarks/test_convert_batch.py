@@ -0,0 +1,65 @@
+"""POST /currency/convert/batch against one GET /currency/convert per amount.
+
+Opt-in: ``python -m pytest -m benchmark -s tests/benchmarks``. BENCHMARK_CONVERT_ITEMS sets
+the number of amounts (default 2000, spread over 60 weekdays).
+"""
+
+from datetime import date, timedelta
+import os
+import time
+
+import pytest
+
+from src.core.dependencies import get_rates_fetcher
+from src.main import app
+
+pytestmark = [pytest.mark.anyio, pytest.mark.benchmark]
+
+ITEMS = int(os.environ.get("BENCHMARK_CONVERT_ITEMS", "2000"))
+
+
+async def test_batch_conversion_beats_scalar_calls(client, rates_fetcher):
+    app.dependency_overrides[get_rates_fetcher] = lambda: rates_fetcher
+    # Weekdays only: the scalar endpoint does not fill days without a publication
+    weekdays = [
+        day
+        for day in (date(2025, 1, 1) + timedelta(days=offset) for offset in range(84))
+        if day.weekday() < 5
+    ]
+    days = [weekdays[index % len(weekdays)].isoformat() for index in range(ITEMS)]
+    amounts = [100.0 + index for index in range(ITEMS)]
+    batch = {
+        "amounts": amounts,
+        "from_currencies": ["RUB"] * ITEMS,
+        "to_currency": "USD",
+        "dates": days,
+    }
+
+    # Warm the rate caches of both paths so only the conversion is timed
+    await client.post("/currency/convert/batch", json=batch)
+    for day in sorted(set(days)):
+        await client.get(
+            "/currency/convert",
+            params={"amount": 1, "from_currency": "RUB", "to_currency": "USD", "date": day},
+        )
+
+    started = time.perf_counter()
+    scalar = []
+    for amount, day in zip(amounts, days, strict=True):
+        response = await client.get(
+            "/currency/convert",
+            params={"amount": amount, "from_currency": "RUB", "to_currency": "USD", "date": day},
+        )
+        scalar.append(response.json()["converted"])
+    scalar_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    response = await client.post("/currency/convert/batch", json=batch)
+    batch_seconds = time.perf_counter() - started
+
+    print(
+        f"\n{ITEMS} amounts: {ITEMS} scalar calls {scalar_seconds * 1000:.0f} ms, "
+        f"one batch call {batch_seconds * 1000:.1f} ms"
+    )
+    assert response.json()["converted"] == pytest.approx(scalar, abs=0.01)
+    assert batch_seconds * 10 < scalar_seconds
@@ -0,0 +1,58 @@
+"""Keyset pagination of GET /transactions: page 1 against page 10,000 of a 1M-row user.
+
+Opt-in and PostgreSQL only: ``TEST_DATABASE_URL=postgresql+asyncpg://...
+python -m pytest -m benchmark -s tests/benchmarks/test_pagination.py``.
+BENCHMARK_PAGINATION_ROWS sets the size of the user (default 1,000,000).
+"""
+
+import os
+
+import pytest
+from sqlalchemy import text
+
+from src.core.pagination import encode_cursor
+
+pytestmark = [pytest.mark.anyio, pytest.mark.benchmark]
+
+ROWS = int(os.environ.get("BENCHMARK_PAGINATION_ROWS", "1000000"))
+PAGE_SIZE = 100
+
+
+async def test_deep_pages_cost_the_same_as_the_first(postgresql, db, user, timed_get):
+    await db.execute(
+        text(
+            "INSERT INTO transactions (user_id, amount, currency, transaction_type, "
+            "transaction_date, change_seq, created_at, updated_at) "
+            "SELECT :user_id, g % 1000 + 1, 'RUB', 'expense', "
+            "timestamptz '2020-01-01' + g * interval '1 minute', 0, now(), now() "
+            "FROM generate_series(1, :rows) g"
+        ),
+        {"user_id": user.id, "rows": ROWS},
+    )
+    await db.execute(text("ANALYZE transactions"))
+    await db.commit()
+
+    # The cursor the client would hold after walking to the last page
+    depth = ROWS // PAGE_SIZE
+    last_seen = (
+        await db.execute(
+            text(
+                "SELECT transaction_date, id FROM transactions WHERE user_id = :user_id "
+                "ORDER BY transaction_date DESC, id DESC OFFSET :offset LIMIT 1"
+            ),
+            {"user_id": user.id, "offset": (depth - 1) * PAGE_SIZE - 1},
+        )
+    ).one()
+    cursor = encode_cursor([last_seen.transaction_date.isoformat(), last_seen.id])
+
+    first = await timed_get("/transactions", {"limit": PAGE_SIZE})
+    deep = await timed_get("/transactions", {"limit": PAGE_SIZE, "cursor": cursor})
+    offset = await timed_get(
+        "/transactions", {"limit": PAGE_SIZE, "skip": (depth - 1) * PAGE_SIZE}, runs=1
+    )
+
+    print(
+        f"\n{ROWS} rows, {PAGE_SIZE} per page: page 1 {first:.1f} ms, "
+        f"page {depth} by cursor {deep:.1f} ms, by offset {offset:.1f} ms"
+    )
+    assert deep < first * 2 + 5
@@ -0,0 +1,58 @@
+"""GET /transactions/search on a table of a few million rows.
+
+Opt-in and PostgreSQL only: ``TEST_DATABASE_URL=postgresql+asyncpg://...
+python -m pytest -m benchmark -s tests/benchmarks/test_search.py``.
+BENCHMARK_SEARCH_ROWS sets the table size (default 2,000,000 over 200 users).
+
+Selective queries must stay under 50 ms. A word found in most of the user's rows is only
+reported: every match is ranked before the page is cut.
+"""
+
+import os
+
+import pytest
+from sqlalchemy import text
+
+pytestmark = [pytest.mark.anyio, pytest.mark.benchmark]
+
+ROWS = int(os.environ.get("BENCHMARK_SEARCH_ROWS", "2000000"))
+USERS = 200
+TARGET_MS = 50
+
+
+async def test_search_latency(postgresql, db, user, timed_get):
+    await db.execute(
+        text(
+            "INSERT INTO users (username, hashed_password, is_active, data_version, "
+            "tombstones_purged_seq) "
+            "SELECT 'user' || g, 'x', true, 0, 0 FROM generate_series(2, :users) g"
+        ),
+        {"users": USERS},
+    )
+    # Rows go to random users; every 10th is a coffee, every 1000th an invoice
+    await db.execute(
+        text(
+            "INSERT INTO transactions (user_id, amount, currency, description, "
+            "transaction_type, transaction_date, change_seq, created_at, updated_at) "
+            "SELECT :first_user + abs(hashint4(g)) % :users, g % 1000 + 1, 'RUB', "
+            "CASE WHEN g % 1000 = 0 THEN 'invoice ' || g "
+            "WHEN g % 10 = 0 THEN 'coffee at cafe ' || g % 97 "
+            "ELSE 'misc item ' || md5(g::text) END, "
+            "'expense', timestamptz '2020-01-01' + g * interval '1 minute', 0, now(), now() "
+            "FROM generate_series(1, :rows) g"
+        ),
+        {"first_user": user.id, "users": USERS, "rows": ROWS},
+    )
+    await db.execute(text("ANALYZE transactions"))
+    await db.commit()
+
+    timings = {
+        query: await timed_get("/transactions/search", {"q": query})
+        for query in ("invoice", "cafe 5", "zzz", "coffee", "misc")
+    }
+
+    print(f"\n{ROWS} rows over {USERS} users:")
+    for query, milliseconds in timings.items():
+        print(f"  q={query!r}: {milliseconds:.1f} ms")
+    assert timings["invoice"] < TARGET_MS
+    assert timings["zzz"] < TARGET_MS
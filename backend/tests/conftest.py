@@ -0,0 +1,153 @@
+"""Shared fixtures: a fresh database per test, SQLite by default.
+
+Set TEST_DATABASE_URL (e.g. ``postgresql+asyncpg://...``) to run against PostgreSQL; its
+tables are dropped and recreated for every test.
+"""
+
+from collections.abc import AsyncIterator
+from datetime import UTC, date, datetime
+import os
+import re
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("RATES_SYNC_ENABLED", "false")
+
+from fastapi import Depends
+import httpx
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.core import rates
+from src.core.database import Base, get_db, get_session_factory, sync_schema
+from src.core.dependencies import get_current_user
+from src.core.rates import RatesFetcher
+from src.main import app
+import src.models  # noqa: F401
+from src.models.user import User
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+async def engine(tmp_path) -> AsyncIterator[AsyncEngine]:
+    url = os.environ.get("TEST_DATABASE_URL", f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await sync_schema(conn)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine: AsyncEngine) -> sessionmaker:
+    return sessionmaker(engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+
+
+@pytest.fixture
+async def db(session_factory: sessionmaker) -> AsyncIterator[AsyncSession]:
+    async with session_factory() as session:
+        yield session
+
+
+@pytest.fixture
+async def user(db: AsyncSession) -> User:
+    user = User(username="alice", hashed_password="x")
+    db.add(user)
+    await db.commit()
+    return user
+
+
+class StatementLog:
+    """SQL statements sent to the database, in order; executemany calls count once."""
+
+    def __init__(self, engine: AsyncEngine):
+        self.statements: list[str] = []
+        event.listen(engine.sync_engine, "before_cursor_execute", self._record)
+
+    def _record(self, _conn, _cursor, statement, *_args) -> None:
+        self.statements.append(" ".join(statement.split()))
+
+    def clear(self) -> None:
+        self.statements.clear()
+
+    def on(self, table: str) -> list[str]:
+        """Statements that mention ``table``, as their first keyword (SELECT, UPDATE, ...)."""
+        return [
+            statement.split()[0]
+            for statement in self.statements
+            if f" {table} " in f" {statement} ".replace(",", " ")
+        ]
+
+
+@pytest.fixture
+def statements(engine: AsyncEngine) -> StatementLog:
+    return StatementLog(engine)
+
+
+@pytest.fixture
+async def client(session_factory: sessionmaker, user: User) -> AsyncIterator[httpx.AsyncClient]:
+    """API client acting as ``user``, on the test database."""
+
+    async def test_user(db: AsyncSession = Depends(get_db)) -> User:
+        return await db.get(User, user.id)
+
+    # get_db and streamed responses both take their sessions from this factory
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
+    app.dependency_overrides[get_current_user] = test_user
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test/api/v1") as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+_CBR_ARCHIVE = re.compile(r"/archive/(\d{4})/(\d{2})/(\d{2})/")
+
+
+def cbr_usd_value(day: date) -> float:
+    """RUB per USD in the CBR stub; it differs from day to day."""
+    return 90.0 + day.day
+
+
+def _cbr(request: httpx.Request) -> httpx.Response:
+    """CBR stub: an archive publication every weekday, 404 on weekends.
+
+    Latest rates and the fallback provider always answer, with today's rates.
+    """
+    match = _CBR_ARCHIVE.search(request.url.path)
+    day = date(*map(int, match.groups())) if match else datetime.now(UTC).date()
+    if match and day.weekday() >= 5:
+        return httpx.Response(404)
+    if not request.url.path.endswith("daily_json.js"):
+        return httpx.Response(
+            200, json={"base_code": "RUB", "rates": {"USD": 1 / cbr_usd_value(day)}}
+        )
+    return httpx.Response(
+        200,
+        json={
+            "Date": f"{day.isoformat()}T11:30:00+03:00",
+            "Valute": {
+                "USD": {"Nominal": 1, "Value": cbr_usd_value(day)},
+                "EUR": {"Nominal": 1, "Value": 100.0},
+                "AED": {"Nominal": 1, "Value": 25.0},
+            },
+        },
+    )
+
+
+@pytest.fixture
+async def rates_fetcher(session_factory: sessionmaker, monkeypatch) -> AsyncIterator[RatesFetcher]:
+    """A fetcher talking to the CBR stub; rates are stored in the test database."""
+    monkeypatch.setattr(rates, "AsyncSessionLocal", session_factory)
+    rates.rates_cache.clear()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(_cbr)) as http_client:
+        yield RatesFetcher(
+            http_client, cbr_url="http://cbr.test", fallback_url="http://fallback.test"
+        )
+    rates.rates_cache.clear()
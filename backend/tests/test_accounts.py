@@ -0,0 +1,78 @@
+import pytest
+from sqlalchemy import func, select
+
+from src.core.accounts import purge_user_data
+from src.core.config import settings
+from src.models.category import Category
+from src.models.transaction import Transaction
+from src.models.user import User
+
+pytestmark = pytest.mark.anyio
+
+BATCH_ROWS = 3
+TRANSACTIONS = 7
+CATEGORIES = 4
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.fixture
+async def accounts(db, user, monkeypatch) -> User:
+    """``user`` and another user, each with more rows than a purge batch."""
+    monkeypatch.setattr(settings, "account_purge_batch_rows", BATCH_ROWS)
+    other = User(username="bob", hashed_password="x")
+    db.add(other)
+    await db.flush()
+    for owner in (user, other):
+        db.add_all(
+            Category(user_id=owner.id, name=f"category {index}", icon="1")
+            for index in range(CATEGORIES)
+        )
+        db.add_all(
+            Transaction(user_id=owner.id, amount=index, currency="RUB", transaction_type="expense")
+            for index in range(TRANSACTIONS)
+        )
+    await db.commit()
+    return other
+
+
+async def count_rows(db, model, user_id: int) -> int:
+    return await db.scalar(select(func.count()).where(model.user_id == user_id))
+
+
+async def test_purge_deletes_in_batches(db, user, accounts, statements):
+    statements.clear()
+    deleted = await purge_user_data(db, user.id)
+
+    assert deleted == TRANSACTIONS + CATEGORIES
+    # One DELETE per batch, and the last batch is the first one short of BATCH_ROWS;
+    # rows are never read into Python
+    assert statements.on("transactions") == ["DELETE"] * 3
+    assert statements.on("categories") == ["DELETE"] * 2
+    for model in (Transaction, Category):
+        assert await count_rows(db, model, user.id) == 0
+        assert await count_rows(db, model, accounts.id) > 0
+
+
+async def test_interrupted_purge_continues(db, user, accounts):
+    async def interrupt(_deleted: int) -> None:
+        raise Interrupted
+
+    with pytest.raises(Interrupted):
+        await purge_user_data(db, user.id, interrupt)
+    # The first batch was committed before the interruption
+    assert await count_rows(db, Transaction, user.id) == TRANSACTIONS - BATCH_ROWS
+
+    progress = []
+
+    async def on_progress(deleted: int) -> None:
+        progress.append(deleted)
+
+    deleted = await purge_user_data(db, user.id, on_progress)
+
+    assert deleted == TRANSACTIONS - BATCH_ROWS + CATEGORIES
+    assert progress[-1] == deleted
+    for model in (Transaction, Category):
+        assert await count_rows(db, model, user.id) == 0
@@ -0,0 +1,12 @@
+import pytest
+
+from src.core.pagination import encode_cursor
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_cursor_must_hold_an_id(client):
+    response = await client.get("/categories", params={"cursor": encode_cursor(["x"])})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,24 @@
+import pytest
+
+from src.core.dependencies import get_rates_fetcher
+from src.main import app
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_convert_batch_fills_sparse_dates_from_their_own_week(client, rates_fetcher):
+    app.dependency_overrides[get_rates_fetcher] = lambda: rates_fetcher
+    # RUB per USD in the stub is 90 + day of month; Saturday 2025-03-15 uses Friday's 104
+    response = await client.post(
+        "/currency/convert/batch",
+        json={
+            "amounts": [99.0, 104.0],
+            "from_currencies": ["RUB", "RUB"],
+            "to_currency": "USD",
+            "dates": ["2025-01-09", "2025-03-15"],
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json()["converted"] == [pytest.approx(1.0), pytest.approx(1.0)]
+    assert response.json()["missing_dates"] == []
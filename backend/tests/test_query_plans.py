@@ -0,0 +1,144 @@
+"""EXPLAIN the queries behind the list endpoints and check they use the intended index.
+
+PostgreSQL only (TEST_DATABASE_URL): SQLite's planner says little about production plans.
+The data is large and skewed enough for the planner to prefer an index over a scan.
+"""
+
+from collections.abc import Callable
+
+import httpx
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from src.models.user import User
+
+pytestmark = pytest.mark.anyio
+
+USERS = 50
+ROWS_PER_USER = 2000
+CATEGORIES_PER_USER = 20
+
+
+@pytest.fixture
+async def seeded(db: AsyncSession, user: User) -> dict:
+    if db.get_bind().dialect.name != "postgresql":
+        pytest.skip("query plans are checked on PostgreSQL only")
+
+    await db.execute(
+        text(
+            "INSERT INTO users (username, hashed_password, is_active, data_version, "
+            "tombstones_purged_seq) "
+            "SELECT 'user' || g, 'x', true, 0, 0 FROM generate_series(2, :users) g"
+        ),
+        {"users": USERS},
+    )
+    await db.execute(
+        text(
+            "INSERT INTO categories (user_id, name, icon, change_seq, created_at, updated_at) "
+            "SELECT u.id, 'category ' || g, '1', g, now(), now() "
+            "FROM users u CROSS JOIN generate_series(1, :categories) g"
+        ),
+        {"categories": CATEGORIES_PER_USER},
+    )
+    # One category in CATEGORIES_PER_USER and one income in 20 per user, one row a day
+    await db.execute(
+        text(
+            "INSERT INTO transactions (user_id, amount, currency, transaction_type, category_id, "
+            "transaction_date, change_seq, created_at, updated_at) "
+            "SELECT u.id, g, 'RUB', CASE WHEN g % 20 = 0 THEN 'income' ELSE 'expense' END, "
+            "(SELECT min(id) FROM categories c WHERE c.user_id = u.id) + g % :categories, "
+            "timestamptz '2020-01-01' + g * interval '1 day', g, now(), now() "
+            "FROM users u CROSS JOIN generate_series(1, :rows) g"
+        ),
+        {"categories": CATEGORIES_PER_USER, "rows": ROWS_PER_USER},
+    )
+    await db.execute(text("ANALYZE"))
+    await db.commit()
+
+    category_id = await db.scalar(
+        text("SELECT min(id) FROM categories WHERE user_id = :user_id"), {"user_id": user.id}
+    )
+    transaction_id = await db.scalar(
+        text("SELECT max(id) FROM transactions WHERE user_id = :user_id"), {"user_id": user.id}
+    )
+    return {"category_id": category_id, "transaction_id": transaction_id}
+
+
+async def explain(
+    engine: AsyncEngine, client: httpx.AsyncClient, path: str, params: dict, table: str
+) -> str:
+    """The plan of the last query on ``table`` sent while serving ``GET path``."""
+    queries = []
+
+    def record(_conn, _cursor, statement, parameters, *_args) -> None:
+        if statement.lstrip().startswith("SELECT") and f"FROM {table}" in statement:
+            queries.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = await client.get(path, params=params)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+    assert response.status_code == 200, response.text
+
+    statement, parameters = queries[-1]
+    async with engine.connect() as conn:
+        result = await conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+        return "\n".join(line for (line,) in result)
+
+
+# Name: (request for the seeded data, table, acceptable indexes)
+PLANS: dict[str, tuple[Callable[[dict], tuple[str, dict]], str, tuple[str, ...]]] = {
+    "list": (lambda _: ("/transactions", {}), "transactions", ("ix_transactions_user_date_id",)),
+    "date range": (
+        lambda _: ("/transactions", {"start_date": "2021-01-01", "end_date": "2021-01-31"}),
+        "transactions",
+        ("ix_transactions_user_date_id",),
+    ),
+    "category": (
+        lambda seeded: ("/transactions", {"category_id": seeded["category_id"]}),
+        "transactions",
+        ("ix_transactions_user_category",),
+    ),
+    "type and dates": (
+        lambda _: (
+            "/transactions",
+            {"transaction_type": "income", "start_date": "2021-01-01", "end_date": "2022-12-31"},
+        ),
+        "transactions",
+        ("ix_transactions_user_type_date",),
+    ),
+    "one transaction": (
+        lambda seeded: (f"/transactions/{seeded['transaction_id']}", {}),
+        "transactions",
+        ("transactions_pkey", "ix_transactions_id"),
+    ),
+    # A user has few categories, so either index on user_id serves them
+    "categories": (
+        lambda _: ("/categories", {}),
+        "categories",
+        ("ix_categories_user_id_id", "ix_categories_user_change_seq"),
+    ),
+    "sync transactions": (
+        lambda _: ("/sync/changes", {}),
+        "transactions",
+        ("ix_transactions_user_change_seq",),
+    ),
+    "sync categories": (
+        lambda _: ("/sync/changes", {}),
+        "categories",
+        ("ix_categories_user_change_seq", "ix_categories_user_id_id"),
+    ),
+}
+
+
+@pytest.mark.parametrize("name", PLANS)
+async def test_query_uses_index(engine, client, seeded, name):
+    request_for, table, indexes = PLANS[name]
+    path, params = request_for(seeded)
+
+    plan = await explain(engine, client, path, params, table)
+
+    assert any(index in plan for index in indexes), plan
+    assert f"Seq Scan on {table}" not in plan, plan
@@ -0,0 +1,31 @@
+from datetime import date
+
+import pytest
+
+from src.core.rates import load_rates_for_dates
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_weekend_takes_the_last_publication_before_it(rates_fetcher):
+    rates_by_date, missing = await load_rates_for_dates(
+        rates_fetcher, [date(2025, 3, 14), date(2025, 3, 15), date(2025, 3, 16)]
+    )
+
+    assert missing == []
+    assert {day: rates["date"] for day, rates in rates_by_date.items()} == {
+        "2025-03-14": "2025-03-14",
+        "2025-03-15": "2025-03-14",
+        "2025-03-16": "2025-03-14",
+    }
+
+
+async def test_fill_does_not_carry_rates_across_a_gap(rates_fetcher):
+    # Saturday 2025-03-15 follows Friday 2025-03-14, not the requested 2025-01-09
+    rates_by_date, missing = await load_rates_for_dates(
+        rates_fetcher, [date(2025, 1, 9), date(2025, 3, 15)]
+    )
+
+    assert missing == []
+    assert rates_by_date["2025-01-09"]["date"] == "2025-01-09"
+    assert rates_by_date["2025-03-15"]["date"] == "2025-03-14"
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from src.core.dependencies import get_rates_fetcher_factory
+from src.core.pagination import encode_cursor
+from src.main import app
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_list_without_display_currency_needs_no_rates(client):
+    # The test client runs no lifespan, so the app has no HTTP client for rate providers
+    await client.post("/transactions", json={"amount": 5, "transaction_type": "expense"})
+
+    response = await client.get("/transactions")
+
+    assert response.status_code == 200
+    assert [txn["converted_amount"] for txn in response.json()] == [None]
+
+
+async def test_display_currency_on_sparse_dates(client, rates_fetcher):
+    app.dependency_overrides[get_rates_fetcher_factory] = lambda: lambda: rates_fetcher
+    # RUB per USD in the stub is 90 + day of month; Saturday 2025-03-15 uses Friday's 104
+    for amount, day in [(99, "2025-01-09T12:00:00Z"), (104, "2025-03-15T12:00:00Z")]:
+        await client.post(
+            "/transactions",
+            json={"amount": amount, "transaction_type": "expense", "transaction_date": day},
+        )
+
+    response = await client.get("/transactions", params={"display_currency": "USD"})
+
+    assert response.status_code == 200
+    assert [txn["converted_amount"] for txn in response.json()] == [
+        pytest.approx(1.0),
+        pytest.approx(1.0),
+    ]
+
+
+async def test_cursor_must_hold_a_date_and_an_id(client):
+    for cursor in (["2026-01-05T00:00:00+00:00", "x"], ["x", 1]):
+        response = await client.get("/transactions", params={"cursor": encode_cursor(cursor)})
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
+
+
+async def test_export_streams_the_filtered_rows(client):
+    for amount, kind in [(5, "expense"), (7, "income"), (9, "expense")]:
+        await client.post("/transactions", json={"amount": amount, "transaction_type": kind})
+
+    response = await client.get(
+        "/transactions/export", params={"format": "ndjson", "transaction_type": "expense"}
+    )
+
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(row["amount"] for row in rows) == [5.0, 9.0]
@@ -0,0 +1,182 @@
+import io
+import json
+
+import pytest
+from sqlalchemy import select
+
+from src.core import user_data
+from src.core.bulk_copy import supports_copy
+from src.core.user_data import export_document, import_document
+from src.models.category import Category
+from src.models.transaction import Transaction
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_export_reads_one_snapshot(db, session_factory, user):
+    if db.get_bind().dialect.name != "postgresql":
+        pytest.skip("only PostgreSQL exports from one snapshot")
+    db.add(Category(user_id=user.id, name="Food", icon="f"))
+    await db.commit()
+
+    chunks = []
+    async for chunk in export_document(user, session_factory):
+        chunks.append(chunk)
+        if chunk == '],"transactions":[':
+            # Written after the categories were read, before the transactions are
+            category = Category(user_id=user.id, name="Travel", icon="t")
+            db.add(category)
+            await db.flush()
+            db.add(
+                Transaction(
+                    user_id=user.id,
+                    amount=5.0,
+                    currency="RUB",
+                    transaction_type="expense",
+                    category_id=category.id,
+                )
+            )
+            await db.commit()
+
+    document = json.loads("".join(chunks))
+    assert [category["name"] for category in document["categories"]] == ["Food"]
+    assert document["transactions"] == []
+
+
+async def test_export_imports_back(client):
+    category = (await client.post("/categories", json={"name": "Café", "icon": "c"})).json()
+    created = [
+        {"amount": 100, "transaction_type": "expense", "category_id": category["id"]},
+        {"amount": 0.1, "currency": "USD", "transaction_type": "income", "description": 'a "b"\n'},
+        {"amount": 7.5, "transaction_type": "expense", "transaction_date": "2025-01-09T12:00:00Z"},
+    ]
+    for txn in created:
+        await client.post("/transactions", json=txn)
+    exported = await client.get("/users/me/export")
+    document = json.loads(exported.text)
+    ids = [txn["id"] for txn in document["transactions"]]
+    await client.request("DELETE", "/transactions/bulk", json={"ids": ids})
+
+    response = await client.post(
+        "/users/me/import", files={"file": ("export.json", exported.content)}
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json()["imported_categories"] == 0
+    assert response.json()["imported_transactions"] == len(created)
+    reexported = json.loads((await client.get("/users/me/export")).text)
+    assert reexported["categories"] == document["categories"]
+
+    def content(txn: dict) -> dict:
+        return {key: value for key, value in txn.items() if key not in ("id", "created_at")}
+
+    assert [content(txn) for txn in reexported["transactions"]] == [
+        content(txn) for txn in document["transactions"]
+    ]
+
+
+async def test_copy_import_resolves_categories_in_sql(db, user, statements):
+    if not supports_copy(db):
+        pytest.skip("the COPY import runs on PostgreSQL with asyncpg only")
+    food = Category(user_id=user.id, name="Food", icon="f")
+    db.add(food)
+    await db.commit()
+    document = {
+        "version": "1.0",
+        "categories": [
+            {"name": "Food", "icon": "x"},
+            {"name": "Travel", "icon": "a"},
+            {"name": "Travel", "icon": "b"},
+        ],
+        "transactions": [
+            {"amount": 1, "transaction_type": "expense", "category_id": food.id},
+            {"amount": 2, "transaction_type": "expense", "category_name": "Travel"},
+        ],
+    }
+    buffer = io.BytesIO(json.dumps(document).encode())
+
+    async def read(size: int) -> bytes:
+        return buffer.read(size)
+
+    statements.clear()
+    summary = await import_document(db, user, read)
+    await db.commit()
+
+    assert summary["imported_categories"] == 1
+    # Categories are inserted and resolved by INSERT ... SELECT, never read into Python
+    assert set(statements.on("categories")) == {"INSERT"}
+    assert any(
+        statement.startswith("INSERT INTO categories") and "DISTINCT ON" in statement
+        for statement in statements.statements
+    )
+    travel = await db.scalar(select(Category).filter_by(user_id=user.id, name="Travel"))
+    assert travel.icon == "a"
+    category_ids = await db.scalars(
+        select(Transaction.category_id).filter_by(user_id=user.id).order_by(Transaction.amount)
+    )
+    assert list(category_ids) == [food.id, travel.id]
+
+
+async def test_export_imports_back_into_its_account_as_duplicates(client, statements):
+    category = (await client.post("/categories", json={"name": "Food", "icon": "f"})).json()
+    rows = [
+        {"amount": 100, "transaction_type": "expense", "category_id": category["id"]},
+        # Identical rows are kept apart by their occurrence number
+        {"amount": 5.5, "transaction_type": "income", "transaction_date": "2026-01-05T10:00:00Z"},
+        {"amount": 5.5, "transaction_type": "income", "transaction_date": "2026-01-05T10:00:00Z"},
+    ]
+    ids = [(await client.post("/transactions", json=row)).json()["id"] for row in rows]
+    await client.put(f"/transactions/{ids[0]}", json={"description": "edited"})
+    export = await client.get("/users/me/export")
+
+    async def import_export() -> dict:
+        response = await client.post(
+            "/users/me/import", files={"file": ("export.json", export.content)}
+        )
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    for _ in range(2):
+        statements.clear()
+        summary = await import_export()
+        assert (summary["imported_transactions"], summary["skipped_transactions"]) == (0, 3)
+    # The rows were fingerprinted by the first import, so the second one updates none
+    assert "UPDATE" not in statements.on("transactions")
+    assert len((await client.get("/transactions")).json()) == 3
+
+    # A deleted row is imported again
+    await client.delete(f"/transactions/{ids[1]}")
+    summary = await import_export()
+    assert (summary["imported_transactions"], summary["skipped_transactions"]) == (1, 2)
+    assert len((await client.get("/transactions")).json()) == 3
+
+
+async def test_copy_and_batched_imports_agree(db, user, monkeypatch):
+    if not supports_copy(db):
+        pytest.skip("the COPY import runs on PostgreSQL with asyncpg only")
+    document = json.dumps(
+        {
+            "version": "1.0",
+            "transactions": [
+                # PostgreSQL prints this amount as "100", Python as "100.0"
+                {"amount": 100, "transaction_type": "expense", "transaction_date": "2026-01-01"},
+                {"amount": 0.1, "transaction_type": "expense", "transaction_date": "2026-01-05"},
+                {"amount": 0.1, "transaction_type": "expense", "transaction_date": "2026-01-05"},
+            ],
+        }
+    ).encode()
+
+    async def run_import() -> dict:
+        buffer = io.BytesIO(document)
+
+        async def read(size: int) -> bytes:
+            return buffer.read(size)
+
+        summary = await import_document(db, user, read)
+        await db.commit()
+        return summary
+
+    assert (await run_import())["imported_transactions"] == 3
+    monkeypatch.setattr(user_data, "supports_copy", lambda _db: False)
+    summary = await run_import()
+    assert (summary["imported_transactions"], summary["skipped_transactions"]) == (0, 3)
@@ -0,0 +1,78 @@
+from datetime import UTC, datetime
+
+import pytest
+
+from src.core.writes import update_owned, update_owned_with_previous
+from src.models.transaction import Transaction
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def transaction(db, user) -> Transaction:
+    transaction = Transaction(
+        user_id=user.id,
+        amount=10.0,
+        currency="RUB",
+        transaction_type="expense",
+        transaction_date=datetime(2026, 1, 5, tzinfo=UTC),
+    )
+    db.add(transaction)
+    await db.commit()
+    return transaction
+
+
+def is_postgresql(db) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+async def test_update_owned_is_one_statement(db, user, transaction, statements):
+    statements.clear()
+    row = await update_owned(
+        db, Transaction, row_id=transaction.id, user_id=user.id, values={"amount": 12.5}
+    )
+
+    assert row["amount"] == 12.5
+    assert statements.on("transactions") == ["UPDATE"]
+
+
+async def test_update_owned_misses_other_users_rows(db, user, transaction, statements):
+    statements.clear()
+    row = await update_owned(
+        db, Transaction, row_id=transaction.id, user_id=user.id + 1, values={"amount": 12.5}
+    )
+
+    assert row is None
+    assert statements.on("transactions") == ["UPDATE"]
+
+
+async def test_update_owned_with_previous(db, user, transaction, statements):
+    statements.clear()
+    previous, updated = await update_owned_with_previous(
+        db, Transaction, row_id=transaction.id, user_id=user.id, values={"amount": 12.5}
+    )
+
+    assert (previous["amount"], updated["amount"]) == (10.0, 12.5)
+    # Other dialects cannot return the FROM snapshot and read the row first
+    expected = ["UPDATE"] if is_postgresql(db) else ["SELECT", "UPDATE"]
+    assert statements.on("transactions") == expected
+
+
+async def test_update_endpoint_does_not_reload_the_row(client, db, transaction, statements):
+    statements.clear()
+    response = await client.put(f"/transactions/{transaction.id}", json={"amount": 12.5})
+
+    assert response.status_code == 200
+    assert response.json()["amount"] == 12.5
+    expected = ["UPDATE"] if is_postgresql(db) else ["SELECT", "UPDATE"]
+    assert statements.on("transactions") == expected
+
+
+async def test_delete_endpoint_is_one_update(client, transaction, statements):
+    statements.clear()
+    response = await client.delete(f"/transactions/{transaction.id}")
+
+    assert response.status_code == 204
+    assert statements.on("transactions") == ["UPDATE"]
+    response = await client.delete(f"/transactions/{transaction.id}")
+    assert response.status_code == 404